@@ -0,0 +1,36 @@
+"""trigram search indexes
+
+Revision ID: 2f6c9a1d7e3b
+Revises: 8d3f0b6e2a17
+Create Date: 2026-10-18 11:02:19.664810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6c9a1d7e3b'
+down_revision: Union[str, None] = '8d3f0b6e2a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The indexed expressions must match search_document() in
+# app/endpoints/dependencies/search.py for the planner to use them.
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_clientes_search_trgm ON clientes USING gin "
+        "((nombre || ' ' || email || ' ' || telefono) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_empresas_search_trgm ON empresas USING gin "
+        "((nombre || ' ' || rnc) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_empresas_search_trgm', table_name='empresas')
+    op.drop_index('ix_clientes_search_trgm', table_name='clientes')
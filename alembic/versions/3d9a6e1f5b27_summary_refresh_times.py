@@ -0,0 +1,60 @@
+"""summary refresh times
+
+Revision ID: 3d9a6e1f5b27
+Revises: 7c2e5a9b4f18
+Create Date: 2026-10-18 21:12:45.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9a6e1f5b27'
+down_revision: Union[str, None] = '7c2e5a9b4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The view as in 7c2e5a9b4f18 without the per-row refreshed_at, which made
+# every row differ on each refresh, so REFRESH ... CONCURRENTLY rewrote them
+# all. Must match summary_query() in app/endpoints/dependencies/summary.py.
+VIEW = """
+    CREATE MATERIALIZED VIEW cuentas_resumen AS
+    SELECT
+        c.cuenta_id,
+        c.rnc,
+        c.organizacion_id,
+        c.created_at,
+        (SELECT count(*) FROM cuentas_servicios cs
+         WHERE cs.cuenta_id = c.cuenta_id) AS servicios,
+        (SELECT count(*) FROM clientes_empresas ce
+         WHERE ce.rnc = c.rnc) AS clientes,
+        (SELECT count(DISTINCT ts.tag_id) FROM cuentas_servicios cs
+         JOIN tags_servicios ts ON ts.servicio_id = cs.servicio_id
+         WHERE cs.cuenta_id = c.cuenta_id) AS tags
+    FROM cuentas c
+"""
+
+
+def upgrade() -> None:
+    op.create_table('summary_refreshes',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("DROP MATERIALIZED VIEW cuentas_resumen")
+    op.execute(VIEW)
+    op.execute("INSERT INTO summary_refreshes (name, refreshed_at) VALUES ('cuentas_resumen', now())")
+    op.create_index('ix_cuentas_resumen_cuenta_id', 'cuentas_resumen', ['cuenta_id'], unique=True)
+    op.create_index('ix_cuentas_resumen_tenant_created_at_cuenta_id', 'cuentas_resumen', ['organizacion_id', 'created_at', 'cuenta_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW cuentas_resumen")
+    op.execute(VIEW.replace("AS tags\n", "AS tags,\n        now() AS refreshed_at\n"))
+    op.create_index('ix_cuentas_resumen_cuenta_id', 'cuentas_resumen', ['cuenta_id'], unique=True)
+    op.create_index('ix_cuentas_resumen_tenant_created_at_cuenta_id', 'cuentas_resumen', ['organizacion_id', 'created_at', 'cuenta_id'], unique=False)
+    op.drop_table('summary_refreshes')
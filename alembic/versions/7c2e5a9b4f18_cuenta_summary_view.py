@@ -0,0 +1,48 @@
+"""cuenta summary view
+
+Revision ID: 7c2e5a9b4f18
+Revises: e1b7d4c5a823
+Create Date: 2026-10-18 19:41:07.213559
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e5a9b4f18'
+down_revision: Union[str, None] = 'e1b7d4c5a823'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match summary_query() in app/endpoints/dependencies/summary.py. Each
+# count is an index lookup on the link table's leading key.
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW cuentas_resumen AS
+        SELECT
+            c.cuenta_id,
+            c.rnc,
+            c.organizacion_id,
+            c.created_at,
+            (SELECT count(*) FROM cuentas_servicios cs
+             WHERE cs.cuenta_id = c.cuenta_id) AS servicios,
+            (SELECT count(*) FROM clientes_empresas ce
+             WHERE ce.rnc = c.rnc) AS clientes,
+            (SELECT count(DISTINCT ts.tag_id) FROM cuentas_servicios cs
+             JOIN tags_servicios ts ON ts.servicio_id = cs.servicio_id
+             WHERE cs.cuenta_id = c.cuenta_id) AS tags,
+            now() AS refreshed_at
+        FROM cuentas c
+        """
+    )
+    # REFRESH ... CONCURRENTLY needs a unique index covering every row.
+    op.create_index('ix_cuentas_resumen_cuenta_id', 'cuentas_resumen', ['cuenta_id'], unique=True)
+    op.create_index('ix_cuentas_resumen_tenant_created_at_cuenta_id', 'cuentas_resumen', ['organizacion_id', 'created_at', 'cuenta_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW cuentas_resumen")
@@ -0,0 +1,51 @@
+"""unique tag names
+
+Revision ID: 8d3f0b6e2a17
+Revises: 5b1e7d2a9c41
+Create Date: 2026-10-18 09:12:47.301955
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f0b6e2a17'
+down_revision: Union[str, None] = '5b1e7d2a9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Merge duplicate tags into the oldest tag of each name before the unique
+    # index can be built, moving their servicio links over.
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE tag_merges AS
+        SELECT t.tag_id AS duplicate_id, keep.tag_id AS keep_id
+        FROM tags t
+        JOIN LATERAL (
+            SELECT k.tag_id FROM tags k WHERE k.nombre = t.nombre
+            ORDER BY k.created_at, k.tag_id LIMIT 1
+        ) keep ON keep.tag_id <> t.tag_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO tags_servicios (tag_id, servicio_id, created_at)
+        SELECT m.keep_id, ts.servicio_id, ts.created_at
+        FROM tags_servicios ts JOIN tag_merges m ON m.duplicate_id = ts.tag_id
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(
+        "DELETE FROM tags_servicios WHERE tag_id IN (SELECT duplicate_id FROM tag_merges)"
+    )
+    op.execute("DELETE FROM tags WHERE tag_id IN (SELECT duplicate_id FROM tag_merges)")
+    op.execute("DROP TABLE tag_merges")
+    op.create_index('uq_tags_nombre', 'tags', ['nombre'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_tags_nombre', table_name='tags')
@@ -0,0 +1,62 @@
+"""organizacion tenancy
+
+Revision ID: e1b7d4c5a823
+Revises: a4e8c2f19d60
+Create Date: 2026-10-18 15:20:44.918302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d4c5a823'
+down_revision: Union[str, None] = 'a4e8c2f19d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TENANT_TABLES = ('clientes', 'empresas', 'servicios', 'cuentas')
+
+# (old index, new index, table, columns after organizacion_id). The list
+# indexes lead on the tenant so a tenant's pages are one index range.
+INDEXES = [
+    ('ix_clientes_created_at_cliente_id', 'ix_clientes_tenant_created_at_cliente_id', 'clientes', ['created_at', 'cliente_id']),
+    ('ix_clientes_nombre_cliente_id', 'ix_clientes_tenant_nombre_cliente_id', 'clientes', ['nombre', 'cliente_id']),
+    ('ix_empresas_created_at_rnc', 'ix_empresas_tenant_created_at_rnc', 'empresas', ['created_at', 'rnc']),
+    ('ix_empresas_nombre_rnc', 'ix_empresas_tenant_nombre_rnc', 'empresas', ['nombre', 'rnc']),
+    ('ix_empresas_tipo_de_persona_created_at_rnc', 'ix_empresas_tenant_tipo_de_persona_created_at_rnc', 'empresas', ['tipo_de_persona', 'created_at', 'rnc']),
+    ('ix_servicios_created_at_servicio_id', 'ix_servicios_tenant_created_at_servicio_id', 'servicios', ['created_at', 'servicio_id']),
+    ('ix_servicios_nombre_servicio_id', 'ix_servicios_tenant_nombre_servicio_id', 'servicios', ['nombre', 'servicio_id']),
+    ('ix_cuentas_created_at_cuenta_id', 'ix_cuentas_tenant_created_at_cuenta_id', 'cuentas', ['created_at', 'cuenta_id']),
+    ('ix_cuentas_rnc_cuenta_id', 'ix_cuentas_tenant_rnc_cuenta_id', 'cuentas', ['rnc', 'cuenta_id']),
+]
+
+
+def upgrade() -> None:
+    for table in TENANT_TABLES:
+        op.add_column(table, sa.Column('organizacion_id', postgresql.UUID(), nullable=True))
+        op.create_foreign_key(f'{table}_organizacion_id_fkey', table, 'organizaciones', ['organizacion_id'], ['organizacion_id'])
+        # Existing rows belong to the only organizacion when there is just one;
+        # otherwise they stay unassigned, invisible to every tenant, until
+        # assigned by hand.
+        op.execute(
+            f"""
+            UPDATE {table} SET organizacion_id = (SELECT organizacion_id FROM organizaciones)
+            WHERE (SELECT count(*) FROM organizaciones) = 1
+            """
+        )
+    for old, new, table, columns in INDEXES:
+        op.drop_index(old, table_name=table)
+        op.create_index(new, table, ['organizacion_id', *columns], unique=False)
+
+
+def downgrade() -> None:
+    for old, new, table, columns in reversed(INDEXES):
+        op.drop_index(new, table_name=table)
+        op.create_index(old, table, columns, unique=False)
+    for table in reversed(TENANT_TABLES):
+        op.drop_constraint(f'{table}_organizacion_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'organizacion_id')
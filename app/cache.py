@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60,
+        timer: Callable[[], float] = monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= self.timer():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (self.timer() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LocalBackend:
+    """
+    Catalog cache backend kept in this process. Invalidation only reaches
+    this worker; other workers drop their entries when they expire.
+    """
+
+    # Whether every worker sees the same entries and invalidations.
+    shared = False
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if key in self.counters:
+            return str(self.counters[key]).encode()
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.cache.set(key, value)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisBackend:
+    """
+    Catalog cache backend shared by all workers through a Redis-compatible
+    server. `client` is any object with the asyncio redis get/set/incr API.
+    """
+
+    shared = True
+
+    def __init__(self, client, ttl: int = 60):
+        self.client = client
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, ttl: int = 60) -> "RedisBackend":
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CATALOG_CACHE_URL requires the redis package") from e
+        return cls(redis.from_url(url), ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(key, value, ex=self.ttl)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class NamespacedCache:
+    """
+    Cache of serialized values on a pluggable backend.
+
+    Every key embeds a generation number and `invalidate` bumps it, dropping
+    all entries at once without scanning the backend. Backend failures count
+    as misses so an unavailable cache never fails a request.
+    """
+
+    def __init__(self, name: str, backend):
+        self.name = name
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.name}:generation"
+
+    async def _key(self, key: str) -> str:
+        generation = await self.backend.get(self.generation_key)
+        return f"{self.name}:{int(generation or 0)}:{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(await self._key(key))
+        except Exception:
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.backend.set(await self._key(key), value)
+        except Exception:
+            self.errors += 1
+
+    async def get_or_set(
+        self, key: str, produce: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        The cached value for `key`, or `produce()`'s result, cached under the
+        generation read before producing it. A value produced while an
+        `invalidate` runs is thus stored under the old generation and never
+        served after it.
+        """
+        try:
+            resolved = await self._key(key)
+            value = await self.backend.get(resolved)
+        except Exception:
+            self.errors += 1
+            resolved = value = None
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await produce()
+        if resolved is not None:
+            try:
+                await self.backend.set(resolved, value)
+            except Exception:
+                self.errors += 1
+        return value
+
+    async def invalidate(self) -> None:
+        try:
+            await self.backend.incr(self.generation_key)
+        except Exception:
+            self.errors += 1
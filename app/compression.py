@@ -0,0 +1,203 @@
+"""
+Response compression.
+
+Bodies are compressed with the best encoding the client accepts, preferring
+zstd, then brotli, then gzip. zstd needs Python 3.14 or the `backports.zstd`
+package and brotli the `brotli` package (`poetry install -E compression`);
+encodings whose module is missing are simply not offered.
+
+COMPRESSION_MINIMUM_SIZE: bytes below which a complete body is sent as is.
+COMPRESSION_GZIP_LEVEL, COMPRESSION_ZSTD_LEVEL, COMPRESSION_BROTLI_QUALITY:
+    per-encoding effort; the defaults favour CPU time over ratio, as suits
+    dynamic responses.
+"""
+import zlib
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import env_int
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+MINIMUM_SIZE = env_int("COMPRESSION_MINIMUM_SIZE", 1024)
+GZIP_LEVEL = env_int("COMPRESSION_GZIP_LEVEL", 6)
+ZSTD_LEVEL = env_int("COMPRESSION_ZSTD_LEVEL", 3)
+BROTLI_QUALITY = env_int("COMPRESSION_BROTLI_QUALITY", 4)
+
+COMPRESSIBLE_TYPES = ("text/", "json", "xml", "javascript", "csv")
+
+
+class GzipEncoder:
+    def __init__(self, level: int = GZIP_LEVEL):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # A sync flush lets the client decode each chunk as it arrives.
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int = ZSTD_LEVEL):
+        self.compressor = zstd.ZstdCompressor(level=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data, zstd.ZstdCompressor.FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zstd.ZstdCompressor.FLUSH_FRAME)
+
+
+class BrotliEncoder:
+    def __init__(self, level: int = BROTLI_QUALITY):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+# In order of preference.
+encoders: dict[str, Callable] = {}
+if zstd is not None:
+    encoders["zstd"] = ZstdEncoder
+if brotli is not None:
+    encoders["br"] = BrotliEncoder
+encoders["gzip"] = GzipEncoder
+
+
+def uncompressed(endpoint: Callable) -> Callable:
+    """
+    Route decorator that opts an endpoint out of compression, e.g. for
+    responses that mix secrets with request data (BREACH).
+    """
+    endpoint.compress = False
+    return endpoint
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    The preferred encoding among those the client accepts, if any.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for name in encoders:
+        if name in accepted or "*" in accepted:
+            return name
+    return None
+
+
+def compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and any(
+        t in content_type for t in COMPRESSIBLE_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies the client accepts an encoding for.
+
+    A body sent in one message is compressed only when it reaches
+    `minimum_size`. Streamed bodies are always compressed, chunk by chunk and
+    flushed after each one, so clients see rows as soon as they are produced.
+    Compressed responses get a weak ETag, since the bytes differ from the
+    identity representation the tag was computed for.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            if encoder is None:
+                body = message.get("body", b"")
+                streaming = message.get("more_body", False)
+                headers = MutableHeaders(scope=start)
+                endpoint = scope.get("endpoint")
+                eligible = (
+                    compressible(headers)
+                    and getattr(endpoint, "compress", True)
+                    and start["status"] not in (204, 304)
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not eligible or (not streaming and len(body) < self.minimum_size):
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = encoders[encoding]()
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if streaming:
+                    del headers["Content-Length"]
+                else:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+            more_body = message.get("more_body", False)
+            body = encoder.compress(message.get("body", b""))
+            if not more_body:
+                body += encoder.finish()
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
@@ -1,32 +1,195 @@
+from fastapi import Request, Response
 from sqlalchemy import URL
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from time import monotonic, perf_counter
+from typing import Callable, Optional
 import os
 
+from .config import env_int, env_bool
+from .instrumentation import instrument_engine
+from .metrics import Histogram
 
-def build_db_engine():
+
+def pool_options_from_env() -> dict:
+    """
+    Read connection pool settings from environment variables.
+
+    DB_POOL_SIZE: connections kept open in the pool.
+    DB_MAX_OVERFLOW: extra connections allowed above DB_POOL_SIZE under load.
+    DB_POOL_TIMEOUT: seconds to wait for a connection before failing.
+    DB_POOL_RECYCLE: seconds after which a connection is replaced, -1 disables.
+    DB_POOL_PRE_PING: ping connections on checkout (pessimistic disconnect
+        handling). When disabled, stale connections are detected on first use
+        and the pool is invalidated instead, so pair it with DB_POOL_RECYCLE.
+    """
+    return {
+        "pool_size": env_int("DB_POOL_SIZE", 5),
+        "max_overflow": env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": env_int("DB_POOL_RECYCLE", -1),
+        "pool_pre_ping": env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = 0
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait_time = self.wait_time
+        pool.timeouts = self.timeouts
+        return pool
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(perf_counter() - start)
+
+
+def pool_status(pool) -> dict:
+    """
+    Snapshot of the engine's connection pool for the internal stats endpoint.
+    """
+    wait_time = getattr(pool, "wait_time", None)
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "timeouts": getattr(pool, "timeouts", 0),
+        "wait_time": wait_time.snapshot() if wait_time is not None else None,
+    }
+
+
+def build_db_engine(host: Optional[str] = None, port: Optional[str] = None):
     """
-    Create an SQLAlchemy engine instance using configuration from environment variables
+    Create an async SQLAlchemy engine instance using configuration from environment variables.
+    DB_DRIVER must name an async DBAPI, e.g. `postgresql+asyncpg`. `host` and
+    `port` override DB_HOST and DB_PORT, e.g. to reach a replica.
     """
     db_url = URL.create(
         drivername=os.environ["DB_DRIVER"],
         username=os.environ["DB_USERNAME"],
         password=os.environ["DB_PASSWORD"],
-        host=os.environ["DB_HOST"],
-        port=os.environ["DB_PORT"],
+        host=host or os.environ["DB_HOST"],
+        port=port or os.environ["DB_PORT"],
         database=os.environ["DB_NAME"],
     )
-    engine = create_engine(db_url, pool_pre_ping=True)
+    engine = create_async_engine(
+        db_url, poolclass=InstrumentedQueuePool, **pool_options_from_env()
+    )
+    instrument_engine(engine.sync_engine)
     return engine
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def build_replica_engines() -> list[AsyncEngine]:
+    """
+    One engine per entry of DB_REPLICA_HOSTS, a comma separated list of
+    `host[:port]` read replicas sharing the primary's credentials and database.
+    """
+    engines = []
+    for entry in os.environ.get("DB_REPLICA_HOSTS", "").split(","):
+        if entry.strip():
+            host, _, port = entry.strip().partition(":")
+            engines.append(build_db_engine(host, port or None))
+    return engines
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines. A replica that fails to hand out a
+    connection is skipped for `retry_after` seconds.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self.down_until: dict[AsyncEngine, float] = {}
+        self.turn = 0
+
+    def candidates(self) -> list[AsyncEngine]:
+        """
+        Healthy replicas, starting with the one whose turn it is.
+        """
+        if not self.engines:
+            return []
+        start = self.turn
+        self.turn = (self.turn + 1) % len(self.engines)
+        now = monotonic()
+        ordered = self.engines[start:] + self.engines[:start]
+        return [e for e in ordered if self.down_until.get(e, 0) <= now]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        self.down_until[engine] = monotonic() + self.retry_after
+
+
+READ_METHODS = ("GET", "HEAD")
+# Set on responses to writes; while present, reads go to the primary so the
+# client sees its own writes despite replication lag.
+PRIMARY_PIN_COOKIE = "db_primary"
+READ_YOUR_WRITES_SECONDS = env_int("DB_READ_YOUR_WRITES_SECONDS", 5)
+
+
+def read_only(endpoint: Callable) -> Callable:
+    """
+    Route decorator for endpoints that only read despite a write method, e.g.
+    POST with a query body: their sessions are routed like GETs.
+    """
+    endpoint.read_only = True
+    return endpoint
+
+
+def is_read(request: Request) -> bool:
+    endpoint = request.scope.get("endpoint")
+    return request.method in READ_METHODS or getattr(endpoint, "read_only", False)
+
+
+async def get_db(request: Request, response: Response):
+    """
+    Session for the current request: reads go to a healthy replica when any
+    are configured, everything else goes to the primary.
+    """
+    if not is_read(request):
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            "1",
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    elif PRIMARY_PIN_COOKIE not in request.cookies:
+        for replica in replicas.candidates():
+            db = SessionLocal(bind=replica)
+            try:
+                # Checks out (and with pre-ping, verifies) a connection.
+                await db.connection()
+            except (SQLAlchemyError, OSError):
+                await db.close()
+                replicas.mark_down(replica)
+                continue
+            async with db:
+                yield db
+            return
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 engine = build_db_engine()
-SessionLocal = sessionmaker(bind=engine)
+replicas = ReplicaSet(
+    build_replica_engines(), retry_after=env_int("DB_REPLICA_RETRY_SECONDS", 30)
+)
+SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -1,12 +1,17 @@
-from fastapi import HTTPException, status, Depends
+import hmac
+from fastapi import HTTPException, Header, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from typing import Annotated
-from sqlalchemy.orm import Session
+from typing import Annotated, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
 from app.database import get_db
-from app.models import User
+from app.models import OrganizacionUsuario, User
 from app.schemas.security import BearerToken
+from app.tenancy import scope_session
 
 
 from .constants import (
@@ -15,6 +20,9 @@ from .constants import (
     AUTH_DESCRIPTION,
     JWT_SECRET,
     JWT_ALGORITHM,
+    METRICS_TOKEN,
+    USER_CACHE_TTL,
+    USER_CACHE_MAXSIZE,
 )
 
 
@@ -39,6 +47,71 @@ invalid_token = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 forbidden_resource = HTTPException(status_code=403, detail="Access forbidden")
+inactive_user = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Inactive user",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+no_organizacion = HTTPException(
+    status_code=403, detail="User does not belong to this organizacion"
+)
+metrics_disabled = HTTPException(
+    status_code=403, detail="Metrics scraping is disabled, set METRICS_TOKEN"
+)
+ambiguous_organizacion = HTTPException(
+    status_code=400,
+    detail="User belongs to several organizaciones, select one with X-Organizacion-Id",
+)
+
+
+class AuthenticatedUser(NamedTuple):
+    usuario_id: UUID
+    rol: str
+    status: bool
+    organizaciones: frozenset[UUID]
+
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL)
+
+
+async def user_organizaciones(session: AsyncSession, usuario_id) -> frozenset[UUID]:
+    query = select(OrganizacionUsuario.organizacion_id).where(
+        OrganizacionUsuario.usuario_id == usuario_id
+    )
+    return frozenset((await session.scalars(query)).all())
+
+
+def cache_user(user: User, organizaciones: frozenset[UUID]) -> AuthenticatedUser:
+    cached = AuthenticatedUser(user.usuario_id, user.rol, user.status, organizaciones)
+    user_cache.set(str(user.usuario_id), cached)
+    return cached
+
+
+def invalidate_user(usuario_id) -> None:
+    user_cache.delete(str(usuario_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+@event.listens_for(OrganizacionUsuario, "after_insert")
+@event.listens_for(OrganizacionUsuario, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    invalidate_user(target.usuario_id)
+
+
+async def load_user(session: AsyncSession, sub: str) -> AuthenticatedUser:
+    """
+    Resolve the token subject to a user, hitting the database only on a cache miss.
+    """
+    cached = user_cache.get(sub)
+    if cached is None:
+        user = await session.get(User, sub)
+        if user is None:
+            raise invalid_token
+        cached = cache_user(user, await user_organizaciones(session, user.usuario_id))
+    if not cached.status:
+        raise inactive_user
+    return cached
 
 
 def parse_auth_header(
@@ -48,37 +121,94 @@ def parse_auth_header(
     return payload
 
 
-def get_superuser(
-    session: Annotated[Session, Depends(get_db)],
+def require_metrics_token(
+    auth_header: Annotated[HTTPAuthorizationCredentials, Depends(auth_scheme)],
+) -> None:
+    """
+    Check the static METRICS_TOKEN, since scrapers cannot obtain user tokens.
+    """
+    if METRICS_TOKEN is None:
+        raise metrics_disabled
+    if not hmac.compare_digest(auth_header.credentials, METRICS_TOKEN):
+        raise invalid_token
+
+
+async def get_role(session: AsyncSession, payload: dict) -> tuple[str, str]:
+    """
+    Return the subject and role, trusting the token's role claim when present.
+    """
+    if "rol" in payload:
+        return payload["sub"], payload["rol"]
+    user = await load_user(session, payload["sub"])
+    return str(user.usuario_id), user.rol
+
+
+async def get_superuser(
+    session: Annotated[AsyncSession, Depends(get_db)],
     payload: Annotated[str, Depends(parse_auth_header)],
 ):
-    user = session.get(User, payload["sub"])
-    if user.rol == "superuser":
-        return user.usuario_id
+    usuario_id, rol = await get_role(session, payload)
+    if rol == "superuser":
+        return usuario_id
 
 
-def get_supervisor(
-    session: Annotated[Session, Depends(get_db)],
+async def get_supervisor(
+    session: Annotated[AsyncSession, Depends(get_db)],
     payload: Annotated[str, Depends(parse_auth_header)],
 ):
-    user = session.get(User, payload["sub"])
-    if user.rol == "supervisor":
-        return user.usuario_id
+    usuario_id, rol = await get_role(session, payload)
+    if rol == "supervisor":
+        return usuario_id
 
 
-def get_user(
-    session: Annotated[Session, Depends(get_db)],
+async def get_user(
+    session: Annotated[AsyncSession, Depends(get_db)],
     payload: Annotated[str, Depends(parse_auth_header)],
 ):
-    user = session.get(User, payload["sub"])
+    user = await load_user(session, payload["sub"])
     return user.usuario_id
 
 
-def create_token(sub: int | str, exp_time_delta: int = 15) -> BearerToken:
+async def get_organizacion(
+    session: Annotated[AsyncSession, Depends(get_db)],
+    payload: Annotated[str, Depends(parse_auth_header)],
+    x_organizacion_id: Annotated[Optional[UUID], Header()] = None,
+) -> UUID:
+    """
+    The organizacion the request acts for: the X-Organizacion-Id header, which
+    must name one of the user's organizaciones, or the user's only one.
+    """
+    user = await load_user(session, payload["sub"])
+    if x_organizacion_id is not None:
+        if x_organizacion_id not in user.organizaciones:
+            raise no_organizacion
+        return x_organizacion_id
+    if not user.organizaciones:
+        raise no_organizacion
+    if len(user.organizaciones) > 1:
+        raise ambiguous_organizacion
+    return next(iter(user.organizaciones))
+
+
+async def scope_to_organizacion(
+    session: Annotated[AsyncSession, Depends(get_db)],
+    organizacion_id: Annotated[UUID, Depends(get_organizacion)],
+) -> UUID:
+    """
+    Restrict the request's session to the organizacion's rows, see app.tenancy.
+    """
+    scope_session(session, organizacion_id)
+    return organizacion_id
+
+
+def create_token(
+    sub: int | str, exp_time_delta: int = 15, rol: str | None = None
+) -> BearerToken:
     """Creates JWT token.
     Args:
         sub (str): It refers to the user ID or identifier of the entity the token represents.
         exp_time_delta: specifies the expiration time in minutes on or after which the JWT must not be accepted for processing.
+        rol (str): Optional role claim, lets role checks skip the user lookup.
 
     Returns:
         str: The string representation of the header, claims, and signature.
@@ -95,6 +225,8 @@ def create_token(sub: int | str, exp_time_delta: int = 15) -> BearerToken:
     current_time = datetime.now(timezone.utc)
     expiration_time = calcualte_exp_time(current_time)
     claims = {"sub": str(sub), "iat": current_time, "exp": expiration_time}
+    if rol is not None:
+        claims["rol"] = rol
     access_token = jwt.encode(claims=claims, key=JWT_SECRET, algorithm=JWT_ALGORITHM)
     token = BearerToken(access_token=access_token, expires_at=expiration_time)
     return token
@@ -111,3 +243,4 @@ def decode_token(token: str) -> dict:
 userDep = Annotated[str, Depends(get_user)]
 superUserDep = Annotated[str, Depends(get_superuser)]
 supervisorDep = Annotated[str, Depends(get_supervisor)]
+organizacionDep = Annotated[UUID, Depends(scope_to_organizacion)]
@@ -0,0 +1,53 @@
+from typing import Annotated, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ...config import env_int
+from ...schemas.batch import BatchResponse
+
+
+MAX_BATCH_IDS = env_int("MAX_BATCH_IDS", 500)
+
+idsQuery = Annotated[
+    Optional[list[str]],
+    Query(
+        description=f"Up to {MAX_BATCH_IDS} comma separated ids to fetch in one "
+        "query instead of a page. Results follow the request order; ids that are "
+        "not found are null and listed in `missing`.",
+    ),
+]
+
+too_many_ids = HTTPException(
+    status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request"
+)
+invalid_id = HTTPException(status_code=400, detail="Invalid id in batch request")
+
+
+def parse_ids(values: list[str], key: InstrumentedAttribute) -> list:
+    """
+    Flatten repeated and comma separated ids and convert them to `key`'s type.
+    """
+    ids = [v.strip() for value in values for v in value.split(",") if v.strip()]
+    if len(ids) > MAX_BATCH_IDS:
+        raise too_many_ids
+    try:
+        return [key.type.python_type(i) for i in ids]
+    except ValueError:
+        raise invalid_id
+
+
+async def fetch_batch(
+    db: AsyncSession, query: Select, key: InstrumentedAttribute, values: list[str]
+) -> BatchResponse:
+    """
+    Resolve the requested ids with a single `key IN (...)` query, plus the
+    eager loads in `query`, and line the rows up with the request.
+    """
+    ids = parse_ids(values, key)
+    rows = (await db.scalars(query.where(key.in_(set(ids))))).all() if ids else []
+    found = {getattr(row, key.key): row for row in rows}
+    missing = list(dict.fromkeys(str(i) for i in ids if i not in found))
+    return BatchResponse(items=[found.get(i) for i in ids], missing=missing)
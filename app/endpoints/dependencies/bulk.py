@@ -0,0 +1,309 @@
+import codecs
+import csv
+import json
+from typing import Annotated, AsyncIterator, Callable, Iterator
+
+import asyncpg
+from fastapi import Query
+
+from pydantic import ValidationError
+from sqlalchemy import Table, column, insert, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...config import env_int
+from ...schemas.bulk import ChunkError, ImportReport, RowError, UpsertReport
+from ...schemas.export import ExportFormat
+from ...tenancy import TENANT_KEY, stamp_rows
+
+
+# Rows validated, loaded and committed together.
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# Rows per INSERT ... ON CONFLICT statement in the upsert endpoints.
+UPSERT_CHUNK_SIZE = env_int("UPSERT_CHUNK_SIZE", 500)
+MAX_UPSERT_CHUNK_SIZE = 5000
+
+chunkSize = Annotated[
+    int,
+    Query(
+        ge=1,
+        le=MAX_UPSERT_CHUNK_SIZE,
+        description="Rows written per statement; a failing chunk is reported and skipped.",
+    ),
+]
+
+# Documents the raw request body, which is read as a stream rather than parsed
+# by FastAPI.
+import_request_body = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {"schema": {"type": "string"}},
+            "text/csv": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+dialect_inserts = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class RowRejected(ValueError):
+    """
+    Raised by row builders for records that are valid but cannot be imported.
+    """
+
+
+class CopyRejected(Exception):
+    """
+    Raised when the database or driver rejects a COPY. COPY runs on the
+    driver connection, so its errors are not wrapped in DBAPIError.
+    """
+
+
+def database_error(error: Exception) -> str:
+    return str(error.orig) if isinstance(error, DBAPIError) else str(error)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of UTF-8 bytes into lines without buffering the whole body.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], format: ExportFormat
+) -> AsyncIterator[dict]:
+    """
+    Yield one dict per record. CSV needs a header row and one record per line;
+    empty CSV fields are treated as missing. Records that cannot be parsed are
+    yielded as the exception instead.
+    """
+    header = None
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            if format is ExportFormat.ndjson:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+            elif header is None:
+                header = next(csv.reader([line]))
+                continue
+            else:
+                values = next(csv.reader([line]))
+                if len(values) != len(header):
+                    raise ValueError(
+                        f"Expected {len(header)} fields, found {len(values)}"
+                    )
+                record = {k: v for k, v in zip(header, values) if v != ""}
+        except ValueError as e:
+            record = e
+        yield record
+
+
+def describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
+def dedupe(rows: list[tuple[int, dict]], key: str) -> Iterator[tuple[int, dict]]:
+    """
+    Keep the last row per key; an upsert cannot touch the same row twice.
+    """
+    return iter({row[key]: (n, row) for n, row in rows}.values())
+
+
+async def copy_upsert(
+    db: AsyncSession, target: Table, key: str, rows: list[dict]
+) -> set:
+    """
+    COPY rows into a per-connection staging table and merge them into
+    `target` with INSERT ... ON CONFLICT in a single statement.
+    """
+    columns = list(rows[0])
+    staging_name = f"{target.name}_import"
+    connection = await db.connection()
+    await connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging_name} "
+            f"(LIKE {target.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+    )
+    raw = await connection.get_raw_connection()
+    try:
+        await raw.driver_connection.copy_records_to_table(
+            staging_name,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns,
+        )
+    except (asyncpg.PostgresError, ValueError) as e:
+        # ValueError covers values the driver cannot encode for the column.
+        raise CopyRejected(str(e)) from e
+    staging = table(staging_name, *(column(c) for c in columns))
+    stmt = postgresql.insert(target).from_select(columns, select(staging))
+    stmt = on_conflict_update(stmt, key, columns).returning(target.c[key])
+    return set((await db.execute(stmt)).scalars())
+
+
+async def executemany_upsert(
+    db: AsyncSession, target: Table, key: str, rows: list[dict]
+) -> set:
+    dialect = db.get_bind().dialect.name
+    stmt = dialect_inserts.get(dialect, insert)(target)
+    stmt = on_conflict_update(stmt, key, list(rows[0])).returning(target.c[key])
+    return set((await db.execute(stmt, rows)).scalars())
+
+
+def on_conflict_update(stmt, key: str, columns: list[str]):
+    """
+    Update the existing row on a key conflict. A row owned by another
+    organizacion is left untouched rather than taken over.
+    """
+    if not hasattr(stmt, "on_conflict_do_update"):
+        return stmt
+    fixed = (key, "created_at", TENANT_KEY)
+    where = None
+    if TENANT_KEY in columns:
+        where = stmt.table.c[TENANT_KEY] == stmt.excluded[TENANT_KEY]
+    return stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={c: stmt.excluded[c] for c in columns if c not in fixed},
+        where=where,
+    )
+
+
+async def upsert_rows(
+    db: AsyncSession, target: Table, key: str, rows: list[dict]
+) -> set:
+    """
+    Insert or update `rows` by `key`, with COPY when the driver supports it.
+    Returns the keys written; rows owned by another organizacion are not.
+    """
+    stamp_rows(db, target, rows)
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+        return await copy_upsert(db, target, key, rows)
+    return await executemany_upsert(db, target, key, rows)
+
+
+async def import_records(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    format: ExportFormat,
+    target: Table,
+    key: str,
+    build_row: Callable[[dict], dict],
+) -> ImportReport:
+    """
+    Validate and upsert an uploaded file batch by batch.
+
+    `build_row` turns a record into a row of `target`, raising ValidationError
+    or RowRejected for records that cannot be imported. Failed records are
+    reported by row number and never abort the load; a batch the database
+    rejects is rolled back and reported as a whole. Rows whose key belongs to
+    another organizacion are left untouched and reported as failed.
+    """
+    report = ImportReport(received=0, imported=0, failed=0, errors=[])
+
+    def fail(row: int, detail: str):
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(RowError(row=row, detail=detail))
+
+    async def flush(batch: list[tuple[int, dict]]):
+        rows = [row for _, row in dedupe(batch, key)]
+        try:
+            written = await upsert_rows(db, target, key, rows)
+            await db.commit()
+        except (DBAPIError, CopyRejected) as e:
+            await db.rollback()
+            for n, _ in batch:
+                fail(n, database_error(e))
+            return
+        for n, row in batch:
+            if row[key] in written:
+                report.imported += 1
+            else:
+                fail(n, "Key belongs to another organizacion")
+
+    batch = []
+    async for record in iter_records(chunks, format):
+        report.received += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            batch.append((report.received, build_row(record)))
+        except (ValidationError, ValueError) as e:
+            fail(report.received, describe(e))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    return report
+
+
+async def upsert_in_chunks(
+    db: AsyncSession, target: Table, key: str, rows: list[dict], chunk_size: int
+) -> UpsertReport:
+    """
+    Upsert `rows` by `key` with one multi-row INSERT ... ON CONFLICT per chunk.
+
+    Rows repeating a key are merged, the last one winning. Each chunk is
+    committed on its own, so a chunk the database rejects is rolled back and
+    reported without losing the others. The primary key of every input row is
+    returned in request order; rows whose key belongs to another organizacion
+    are reported as failed.
+    """
+    stamp_rows(db, target, rows)
+    pk = next(iter(target.primary_key)).name
+    positions: dict = {}
+    for n, row in enumerate(rows):
+        positions.setdefault(row[key], []).append(n)
+    distinct = list({row[key]: row for row in rows}.values())
+    insert_for = dialect_inserts.get(db.get_bind().dialect.name, insert)
+    report = UpsertReport(
+        received=len(rows), upserted=0, failed=0, ids=[None] * len(rows), errors=[]
+    )
+    for start in range(0, len(distinct), chunk_size):
+        chunk = distinct[start : start + chunk_size]
+        stmt = insert_for(target).values(chunk)
+        stmt = on_conflict_update(stmt, key, list(chunk[0]))
+        stmt = stmt.returning(target.c[pk], target.c[key])
+        try:
+            returned = (await db.execute(stmt)).all()
+            await db.commit()
+        except DBAPIError as e:
+            await db.rollback()
+            failed = sorted(n for row in chunk for n in positions[row[key]])
+            report.failed += len(failed)
+            report.errors.append(ChunkError(rows=failed, detail=str(e.orig)))
+            continue
+        for id_, value in returned:
+            for n in positions[value]:
+                report.ids[n] = id_
+                report.upserted += 1
+        skipped = {row[key] for row in chunk} - {value for _, value in returned}
+        if skipped:
+            failed = sorted(n for value in skipped for n in positions[value])
+            report.failed += len(failed)
+            report.errors.append(
+                ChunkError(rows=failed, detail="Key belongs to another organizacion")
+            )
+    return report
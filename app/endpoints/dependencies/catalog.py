@@ -0,0 +1,105 @@
+"""
+Cache for the servicios/tags catalog.
+
+List pages are cached as serialized JSON and the sets of existing ids are
+cached for the endpoints that validate references to them, both per
+organizacion. Every write to
+servicios or tags calls `invalidate_catalog` after committing.
+
+CATALOG_CACHE_URL: Redis-compatible server shared by all workers; when unset
+    each worker keeps its own in-process cache.
+CATALOG_CACHE_TTL: seconds an entry is served before it is rebuilt.
+CATALOG_CACHE_MAXSIZE: entries kept by the in-process cache.
+"""
+import json
+import os
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .filtering import descending, sort_column
+from .pagination import fetch_page
+from .serialization import dump_json
+from ...cache import LocalBackend, NamespacedCache, RedisBackend
+from ...config import env_int
+from ...schemas.filters import ListFilters
+from ...schemas.pagination import PagintationParams, PaginatedResponse
+from ...tenancy import current_tenant
+
+
+def catalog_backend_from_env():
+    ttl = env_int("CATALOG_CACHE_TTL", 60)
+    url = os.environ.get("CATALOG_CACHE_URL")
+    if url:
+        return RedisBackend.from_url(url, ttl=ttl)
+    return LocalBackend(maxsize=env_int("CATALOG_CACHE_MAXSIZE", 256), ttl=ttl)
+
+
+catalog_cache = NamespacedCache("catalog", catalog_backend_from_env())
+
+
+async def invalidate_catalog() -> None:
+    await catalog_cache.invalidate()
+
+
+async def cached_page(
+    db: AsyncSession,
+    query: Select,
+    params: PagintationParams,
+    filters: ListFilters,
+    key: InstrumentedAttribute,
+    schema: type[BaseModel],
+) -> Response:
+    """
+    `fetch_page` through the catalog cache, returning the serialized page.
+    `query` must already be narrowed by `filters`, which are part of the key
+    along with the name of `schema`, since sparse fieldsets vary it.
+    """
+    table = key.class_
+    cache_key = (
+        f"{current_tenant(db)}:{table.__tablename__}:page:{schema.__name__}:"
+        f"{params.model_dump_json()}:{filters.model_dump_json()}"
+    )
+
+    async def produce() -> bytes:
+        sort = sort_column(table, filters)
+        page = await fetch_page(db, query, params, sort, key, descending(filters))
+        return dump_json(PaginatedResponse[schema], page)
+
+    body = await catalog_cache.get_or_set(cache_key, produce)
+    return Response(body, media_type="application/json")
+
+
+async def existing_ids(
+    db: AsyncSession, column: InstrumentedAttribute, ids: Iterable[UUID]
+) -> set[UUID]:
+    """
+    The subset of `ids` present in `column`'s table.
+
+    Checked against the cached id set; ids it does not know are confirmed
+    against the database, so rows created by another worker since the set was
+    cached are still found. An in-process cache is not told of deletes made
+    through other workers, so without a shared backend every id is checked
+    against the database.
+    """
+    ids = set(ids)
+    if not catalog_cache.backend.shared:
+        return set((await db.scalars(select(column).where(column.in_(ids)))).all())
+    cache_key = f"{current_tenant(db)}:{column.class_.__tablename__}:ids"
+
+    async def produce() -> bytes:
+        known = (await db.scalars(select(column))).all()
+        return json.dumps([str(i) for i in known]).encode()
+
+    cached = await catalog_cache.get_or_set(cache_key, produce)
+    known = {UUID(i) for i in json.loads(cached)}
+    found = ids & known
+    if ids - found:
+        query = select(column).where(column.in_(ids - found))
+        found |= set((await db.scalars(query)).all())
+    return found
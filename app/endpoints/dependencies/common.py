@@ -1,10 +1,23 @@
 from typing import Annotated
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from ...database import get_db
 from ...schemas import errors
 
-session = Annotated[Session, Depends(get_db)]
+session = Annotated[AsyncSession, Depends(get_db)]
+
+
+def foreign_key_violation(error: IntegrityError) -> bool:
+    """
+    Whether `error` is a reference to a missing row rather than e.g. a
+    duplicate key: SQLSTATE 23503 on PostgreSQL, or SQLite's message.
+    """
+    orig = error.orig
+    return getattr(orig, "sqlstate", None) == "23503" or (
+        "FOREIGN KEY constraint failed" in str(orig)
+    )
+
 
 errorResponses = {
     401: {
@@ -27,4 +40,8 @@ errorResponses = {
         "model": errors.ServerError,
         "description": "Internal Server Error.",
     },
+    503: {
+        "model": errors.ServerError,
+        "description": "Service Unavailable - The server is overloaded, retry after the given delay.",
+    },
 }
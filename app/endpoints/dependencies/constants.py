@@ -1,6 +1,23 @@
+import os
+
 BEARER_FORMAT = "JWT"
 AUTH_SCHEME_NAME = "bearerAuth"
 AUTH_DESCRIPTION = "Bearer authentication scheme to secure endpoints using JSON Web Token (JWT). Clients to must include a valid access token in the Authorization header of their HTTP requests."
 
 JWT_SECRET = "supersecret"
 JWT_ALGORITHM = "HS256"
+
+# Static bearer token Prometheus presents to scrape /internal/metrics; scraping
+# is refused while it is unset.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Authenticated users are cached in-process to avoid a lookup on every request.
+# Changes made through the ORM in this process invalidate entries immediately,
+# other workers see them once the entry expires.
+USER_CACHE_TTL = 60
+USER_CACHE_MAXSIZE = 1024
+
+# Detail responses carry an ETag. Entities are revalidated on every use, catalog
+# entries (servicios, tags) change rarely and may be reused for a minute.
+CACHE_CONTROL_ENTITY = "private, no-cache"
+CACHE_CONTROL_CATALOG = "private, max-age=60"
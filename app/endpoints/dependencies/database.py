@@ -1,6 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from typing import Annotated
 from app.database import get_db
 
-sessionDep = Annotated[Session, Depends(get_db)]
+sessionDep = Annotated[AsyncSession, Depends(get_db)]
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(version: tuple) -> str:
+    """
+    Strong ETag for a version row from versions.py.
+    """
+    return '"' + hashlib.sha256(repr(version).encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    return etag in tags
+
+
+async def conditional_get(
+    db: AsyncSession,
+    request: Request,
+    response: Response,
+    version_query: Select,
+    cache_control: str,
+) -> None:
+    """
+    Tag the response with an ETag and Cache-Control, and answer 304 Not
+    Modified when the client already holds the current version.
+
+    Does nothing when the version query finds no row, so the endpoint can
+    report the missing entity itself.
+    """
+    version = (await db.execute(version_query)).first()
+    if version is None:
+        return
+    headers = {"ETag": make_etag(tuple(version)), "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,130 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+`fields=` names the columns to return and `expand=` the relationships to
+include, both comma separated. Without either, the full response schema is
+returned; with only `fields`, no relationships are. Only the requested columns
+are SELECTed and only the requested relationships are eager-loaded, with the
+plans from app.endpoints.dependencies.loading. The others are set to raise,
+so serializing something that was not loaded fails loudly.
+"""
+from functools import lru_cache
+from typing import Annotated, NamedTuple, Optional
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import InstrumentedAttribute, load_only, raiseload
+
+from . import loading
+from ...models import Cliente, Cuenta, Empresa, Servicio, Tag
+from ...schemas import cliente_empresa, cuenta, servicio
+
+
+fieldsQuery = Annotated[
+    Optional[str],
+    Query(description="Comma separated fields to return. All fields when omitted."),
+]
+expandQuery = Annotated[
+    Optional[str],
+    Query(
+        description="Comma separated relationships to include. All when both "
+        "`fields` and `expand` are omitted, none when only `fields` is given."
+    ),
+]
+
+
+class Selection(NamedTuple):
+    fields: tuple[str, ...]
+    expand: tuple[str, ...]
+
+
+@lru_cache
+def sparse_schema(schema: type[BaseModel], names: tuple[str, ...]) -> type[BaseModel]:
+    """
+    `schema` restricted to `names`, which keep their types and nested schemas.
+    """
+    if names == tuple(schema.model_fields):
+        return schema
+    return create_model(
+        f"{schema.__name__}[{','.join(names)}]",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            n: (schema.model_fields[n].annotation, schema.model_fields[n])
+            for n in names
+        },
+    )
+
+
+def parse_names(value: str, allowed: tuple[str, ...], kind: str) -> tuple[str, ...]:
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind} {', '.join(sorted(unknown))}; "
+            f"expected any of {', '.join(allowed)}",
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+class Fieldset:
+    """
+    The columns and relationships of `schema` a list endpoint can return.
+    `relations` maps each relationship field to its loading plan.
+    """
+
+    def __init__(self, model: type, schema: type[BaseModel], relations: dict):
+        self.model = model
+        self.schema = schema
+        self.relations = relations
+        self.columns = tuple(n for n in schema.model_fields if n not in relations)
+
+    def selection(
+        self, fields: fieldsQuery = None, expand: expandQuery = None
+    ) -> Selection:
+        """
+        Dependency reading the requested selection from the query string.
+        """
+        if fields is None and expand is None:
+            return Selection(self.columns, tuple(self.relations))
+        columns, relations = self.columns, ()
+        if fields is not None:
+            columns = parse_names(fields, self.columns, "field")
+        if expand is not None:
+            relations = parse_names(expand, tuple(self.relations), "expand")
+        return Selection(columns, relations)
+
+    def options(self, selection: Selection, *also: InstrumentedAttribute) -> list:
+        """
+        Loader options for `selection`. `also` are columns the endpoint needs
+        without returning them, such as the sort column for the next cursor.
+        """
+        names = list(selection.fields)
+        names += [c.key for c in also if c.key not in names]
+        options = [load_only(*(getattr(self.model, n) for n in names))]
+        for name, plan in self.relations.items():
+            if name in selection.expand:
+                options.extend(plan)
+            else:
+                options.append(raiseload(getattr(self.model, name)))
+        return options
+
+    def response_schema(self, selection: Selection) -> type[BaseModel]:
+        return sparse_schema(self.schema, selection.fields + selection.expand)
+
+
+cliente_fields = Fieldset(
+    Cliente, cliente_empresa.Cliente, {"empresas": loading.cliente}
+)
+empresa_fields = Fieldset(
+    Empresa,
+    cliente_empresa.Empresa,
+    {"relacionados": loading.empresa_relacionados, "cuenta": loading.empresa_cuenta},
+)
+cuenta_fields = Fieldset(
+    Cuenta,
+    cuenta.Cuenta,
+    {"empresa": loading.cuenta_empresa, "servicios": loading.cuenta_servicios},
+)
+servicio_fields = Fieldset(Servicio, servicio.Servicio, {"tags": loading.servicio})
+tag_fields = Fieldset(Tag, servicio.Tag, {"servicios": loading.tag})
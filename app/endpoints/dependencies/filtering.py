@@ -0,0 +1,95 @@
+"""
+Filters for the list endpoints, matched to the parameter sets in
+app.schemas.filters.
+
+Each function narrows a list query to the rows its filters select. Filters on
+related rows are `key IN (SELECT ...)` over the link table, which keeps one
+row per entity and is served by the link table's index on the filtered column.
+"""
+from sqlalchemy import Select, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ...models import (
+    Cliente,
+    ClienteEmpresa,
+    Cuenta,
+    CuentaServicio,
+    Empresa,
+    Servicio,
+    Tag,
+    TagServicio,
+)
+from ...schemas.filters import (
+    ClienteFilters,
+    CuentaFilters,
+    EmpresaFilters,
+    ListFilters,
+    ServicioFilters,
+    SortOrder,
+    TagFilters,
+)
+
+
+def sort_column(model: type, filters: ListFilters) -> InstrumentedAttribute:
+    return getattr(model, filters.sort.value)
+
+
+def descending(filters: ListFilters) -> bool:
+    return filters.order is SortOrder.desc
+
+
+def created_between(
+    query: Select, created_at: InstrumentedAttribute, filters: ListFilters
+) -> Select:
+    if filters.created_after is not None:
+        query = query.where(created_at >= filters.created_after)
+    if filters.created_before is not None:
+        query = query.where(created_at < filters.created_before)
+    return query
+
+
+def cliente(query: Select, filters: ClienteFilters) -> Select:
+    query = created_between(query, Cliente.created_at, filters)
+    if filters.empresa is not None:
+        related = select(ClienteEmpresa.cliente_id).where(
+            ClienteEmpresa.rnc == filters.empresa
+        )
+        query = query.where(Cliente.cliente_id.in_(related))
+    return query
+
+
+def empresa(query: Select, filters: EmpresaFilters) -> Select:
+    query = created_between(query, Empresa.created_at, filters)
+    if filters.tipo_de_persona is not None:
+        query = query.where(Empresa.tipo_de_persona == filters.tipo_de_persona.value)
+    return query
+
+
+def servicio(query: Select, filters: ServicioFilters) -> Select:
+    query = created_between(query, Servicio.created_at, filters)
+    if filters.tag is not None:
+        tagged = select(TagServicio.servicio_id).where(
+            TagServicio.tag_id == filters.tag
+        )
+        query = query.where(Servicio.servicio_id.in_(tagged))
+    return query
+
+
+def tag(query: Select, filters: TagFilters) -> Select:
+    query = created_between(query, Tag.created_at, filters)
+    if filters.servicio is not None:
+        tags = select(TagServicio.tag_id).where(
+            TagServicio.servicio_id == filters.servicio
+        )
+        query = query.where(Tag.tag_id.in_(tags))
+    return query
+
+
+def cuenta(query: Select, filters: CuentaFilters) -> Select:
+    query = created_between(query, Cuenta.created_at, filters)
+    if filters.servicio is not None:
+        cuentas = select(CuentaServicio.cuenta_id).where(
+            CuentaServicio.servicio_id == filters.servicio
+        )
+        query = query.where(Cuenta.cuenta_id.in_(cuentas))
+    return query
@@ -0,0 +1,194 @@
+"""
+Nested reads across the entity graph, for POST /query.
+
+A query names a root resource and, level by level, the fields and
+relationships to return, e.g. clientes -> empresas -> cuenta -> servicios ->
+tags. Each relationship in the tree is loaded with one SELECT ... IN over all
+the parent rows of its level, so a query runs one statement per node of the
+tree however many rows it returns.
+
+MAX_QUERY_DEPTH: the deepest relationship nesting a query may ask for.
+MAX_QUERY_COST: the most statements, i.e. nodes, a query may run.
+"""
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, load_only, selectinload
+
+from .batch import fetch_batch
+from ...config import env_int
+from ...models import Cliente, Cuenta, Empresa, Servicio, Tag
+from ...schemas.batch import BatchResponse
+from ...schemas.cliente_empresa import ClienteInDB, EmpresaInDB
+from ...schemas.cuenta import CuentaInDB
+from ...schemas.query import GraphQuery, QueryNode
+from ...schemas.servicio import ServicioInDB, TagInDB
+
+
+MAX_QUERY_DEPTH = env_int("MAX_QUERY_DEPTH", 4)
+MAX_QUERY_COST = env_int("MAX_QUERY_COST", 8)
+
+
+class Entity(NamedTuple):
+    model: type
+    # Flat schema whose fields are the columns a query can return.
+    schema: type[BaseModel]
+    # Relationship name -> the entity it leads to.
+    relations: dict[str, str]
+
+    @property
+    def key(self) -> InstrumentedAttribute:
+        mapper = inspect(self.model)
+        return getattr(
+            self.model, mapper.get_property_by_column(mapper.primary_key[0]).key
+        )
+
+
+entities = {
+    "clientes": Entity(Cliente, ClienteInDB, {"empresas": "empresas"}),
+    "empresas": Entity(
+        Empresa, EmpresaInDB, {"relacionados": "clientes", "cuenta": "cuentas"}
+    ),
+    "cuentas": Entity(
+        Cuenta, CuentaInDB, {"empresa": "empresas", "servicios": "servicios"}
+    ),
+    "servicios": Entity(Servicio, ServicioInDB, {"tags": "tags"}),
+    "tags": Entity(Tag, TagInDB, {"servicios": "servicios"}),
+}
+
+
+class Node(NamedTuple):
+    """
+    A validated query node; hashable, so schemas can be cached per shape.
+    """
+
+    entity: str
+    fields: tuple[str, ...]
+    expand: tuple[tuple[str, "Node"], ...]
+
+
+query_too_deep = HTTPException(
+    status_code=400,
+    detail=f"Query nests relationships deeper than {MAX_QUERY_DEPTH} levels",
+)
+
+no_fields = HTTPException(
+    status_code=400, detail="`fields` must name at least one field when given"
+)
+
+
+def query_too_costly(cost: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Query needs {cost} statements; at most {MAX_QUERY_COST} allowed",
+    )
+
+
+def cost(node: Node) -> int:
+    return 1 + sum(cost(child) for _, child in node.expand)
+
+
+def checked_names(names, allowed: tuple[str, ...], kind: str) -> tuple[str, ...]:
+    """
+    `names` in `allowed`'s order; each name is matched whole, commas included.
+    """
+    unknown = set(names).difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind} {', '.join(sorted(unknown))}; "
+            f"expected any of {', '.join(allowed)}",
+        )
+    return tuple(name for name in allowed if name in names)
+
+
+def build_node(query: QueryNode, entity: str, depth: int = 0) -> Node:
+    columns = tuple(entities[entity].schema.model_fields)
+    relations = entities[entity].relations
+    fields = columns
+    if query.fields is not None:
+        if not query.fields:
+            raise no_fields
+        fields = checked_names(query.fields, columns, "field")
+    expand = checked_names(query.expand, tuple(relations), "expand")
+    if expand and depth == MAX_QUERY_DEPTH:
+        raise query_too_deep
+    return Node(
+        entity,
+        fields,
+        tuple(
+            (name, build_node(query.expand[name], relations[name], depth + 1))
+            for name in expand
+        ),
+    )
+
+
+def resolve(query: GraphQuery) -> Node:
+    """
+    Check `query` against the entity graph and the depth and cost limits.
+    """
+    node = build_node(query, query.resource.value)
+    if cost(node) > MAX_QUERY_COST:
+        raise query_too_costly(cost(node))
+    return node
+
+
+def options(node: Node) -> list:
+    """
+    Loader options reading only the columns and relationships in `node`.
+    """
+    model = entities[node.entity].model
+    mapper = inspect(model)
+    columns = [getattr(model, name) for name in node.fields]
+    loads = []
+    for name, child in node.expand:
+        relationship = getattr(model, name)
+        # Loading a relationship needs the columns that join it to its parent.
+        columns += [
+            getattr(model, mapper.get_property_by_column(c).key)
+            for c in relationship.property.local_columns
+        ]
+        loads.append(selectinload(relationship).options(*options(child)))
+    return [load_only(*columns), *loads]
+
+
+@lru_cache
+def node_schema(node: Node) -> type[BaseModel]:
+    """
+    Response schema for `node`: its fields plus a nested schema per relationship.
+    """
+    entity = entities[node.entity]
+    fields = {
+        name: (
+            entity.schema.model_fields[name].annotation,
+            entity.schema.model_fields[name],
+        )
+        for name in node.fields
+    }
+    for name, child in node.expand:
+        schema = node_schema(child)
+        many = getattr(entity.model, name).property.uselist
+        fields[name] = (list[schema] if many else Optional[schema], ...)
+    return create_model(
+        entity.schema.__name__,
+        __config__=ConfigDict(from_attributes=True),
+        **fields,
+    )
+
+
+async def fetch(
+    db: AsyncSession, node: Node, ids: Optional[list[str]], limit: int
+) -> BatchResponse:
+    """
+    The records `ids` names, in request order, or the first `limit` by key.
+    """
+    entity = entities[node.entity]
+    query = select(entity.model).options(*options(node))
+    if ids is not None:
+        return await fetch_batch(db, query, entity.key, ids)
+    rows = (await db.scalars(query.order_by(entity.key).limit(limit))).all()
+    return BatchResponse(items=rows, missing=[])
@@ -0,0 +1,42 @@
+"""
+Eager-loading plans matched to the response schemas in app.schemas.
+
+Each plan loads exactly the relationships its schema serializes, one
+SELECT ... IN per relationship level, so the number of statements a request
+emits does not grow with the number of rows. Async sessions cannot lazy-load,
+so a relationship missing from a plan fails loudly instead of issuing N+1
+queries.
+"""
+from sqlalchemy.orm import selectinload
+
+from ...models import Cliente, Cuenta, Empresa, Servicio, Tag
+
+
+# schemas.servicio.Servicio: tags
+servicio = (selectinload(Servicio.tags),)
+
+# schemas.servicio.Tag: servicios
+tag = (selectinload(Tag.servicios),)
+
+# schemas.cliente_empresa.Empresa: relacionados, cuenta -> servicios -> tags
+empresa_relacionados = (selectinload(Empresa.relacionados),)
+empresa_cuenta = (
+    selectinload(Empresa.cuenta)
+    .selectinload(Cuenta.servicios)
+    .selectinload(Servicio.tags),
+)
+empresa = (*empresa_relacionados, *empresa_cuenta)
+
+# schemas.cliente_empresa.Cliente: empresas -> (Empresa plan)
+cliente = (selectinload(Cliente.empresas).options(*empresa),)
+
+# Cliente detail: empresas
+cliente_detail = (selectinload(Cliente.empresas),)
+
+# schemas.cuenta.Cuenta: empresa, servicios -> tags
+cuenta_empresa = (selectinload(Cuenta.empresa),)
+cuenta_servicios = (selectinload(Cuenta.servicios).selectinload(Servicio.tags),)
+cuenta = (*cuenta_empresa, *cuenta_servicios)
+
+# Cuenta detail: empresa -> relacionados
+cuenta_detail = (selectinload(Cuenta.empresa).selectinload(Empresa.relacionados),)
@@ -0,0 +1,116 @@
+from fastapi import HTTPException
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ...schemas.pagination import (
+    CountMode,
+    PagintationParams,
+    PaginatedResponse,
+    encode_cursor,
+    decode_cursor,
+)
+from ...tenancy import is_scoped
+
+
+invalid_cursor = HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate_query(
+    query: Select,
+    params: PagintationParams,
+    sort: InstrumentedAttribute,
+    key: InstrumentedAttribute,
+    descending: bool = False,
+) -> Select:
+    """
+    Order a list query by (sort, key) and restrict it to one page.
+
+    With a cursor the page starts right after the cursor's row, which an index
+    on (sort, key) serves in constant time at any depth, scanned backwards for
+    descending order. Otherwise the classic offset is applied. One extra row is
+    fetched to detect a next page.
+    """
+    if descending:
+        query = query.order_by(sort.desc(), key.desc())
+    else:
+        query = query.order_by(sort, key)
+    query = query.limit(params.limit + 1)
+    if params.cursor is None:
+        return query.offset(params.offset)
+    try:
+        cursor_value, cursor_key = decode_cursor(params.cursor, sort.type.python_type)
+        cursor_key = key.type.python_type(cursor_key)
+    except ValueError:
+        raise invalid_cursor
+    row, after = tuple_(sort, key), tuple_(cursor_value, cursor_key)
+    return query.where(row < after if descending else row > after)
+
+
+def count_query(query: Select) -> Select:
+    """
+    Count the rows matched by a list query, ignoring its ordering and window.
+    """
+    counted = query.order_by(None).limit(None).offset(None).subquery()
+    return select(func.count()).select_from(counted)
+
+
+# reltuples is the planner's row estimate maintained by VACUUM/ANALYZE; it is
+# -1 until the table is first analyzed.
+RELTUPLES = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+)
+
+
+async def count_rows(
+    db: AsyncSession, query: Select, mode: CountMode, model: type
+) -> tuple[int, bool]:
+    """
+    Return the total for a list query and whether it is an estimate.
+
+    Estimates come from pg_class and describe the whole table, so they are only
+    used for unfiltered, untenanted queries on PostgreSQL; anything else is
+    counted exactly.
+    """
+    estimable = (
+        query.whereclause is None
+        and not is_scoped(db, model)
+        and db.get_bind().dialect.name == "postgresql"
+    )
+    if mode is CountMode.estimated and estimable:
+        estimate = await db.scalar(RELTUPLES, {"table": model.__tablename__})
+        if estimate is not None and estimate >= 0:
+            return estimate, True
+    return await db.scalar(count_query(query)), False
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    params: PagintationParams,
+    sort: InstrumentedAttribute,
+    key: InstrumentedAttribute,
+    descending: bool = False,
+) -> PaginatedResponse:
+    """
+    Run a list query through `paginate_query` and build the paginated response.
+    """
+    total, estimated = await count_rows(db, query, params.count, sort.class_)
+    query = paginate_query(query, params, sort, key, descending)
+    rows = (await db.scalars(query)).all()
+    items = rows[: params.limit]
+    response = PaginatedResponse(
+        total=total,
+        total_is_estimate=estimated,
+        offset=params.offset,
+        limit=params.limit,
+        items=items,
+    )
+    if len(rows) > params.limit and items:
+        last = items[-1]
+        response.next_cursor = encode_cursor(
+            getattr(last, sort.key), getattr(last, key.key)
+        )
+        if params.cursor is None:
+            response.next_offset = params.offset + params.limit
+    return response
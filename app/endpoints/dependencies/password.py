@@ -1,9 +1,89 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable
+
 from argon2 import PasswordHasher
 from argon2.exceptions import VerificationError
+from fastapi import HTTPException, status
+
+from app.config import env_int
+from app.metrics import Histogram
+
+
+hashing_overloaded = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many password operations in progress, try again shortly",
+    headers={"Retry-After": "1"},
+)
+
+
+def argon2_options_from_env() -> dict:
+    """
+    Read Argon2 cost parameters from ARGON2_TIME_COST, ARGON2_MEMORY_COST (KiB)
+    and ARGON2_PARALLELISM, defaulting to argon2-cffi's recommended values.
+    """
+    return {
+        "time_cost": env_int("ARGON2_TIME_COST", 3),
+        "memory_cost": env_int("ARGON2_MEMORY_COST", 65536),
+        "parallelism": env_int("ARGON2_PARALLELISM", 4),
+    }
+
+
+class HashingPool:
+    """
+    Runs password hashing on a fixed number of threads so it never blocks the
+    event loop. Argon2 releases the GIL while hashing, so threads scale with
+    cores. Once `max_pending` operations are running or queued, new ones are
+    rejected with 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.rejected = 0
+        self.latency = Histogram()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="argon2"
+        )
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise hashing_overloaded
+        self.in_flight += 1
+        start = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.latency.observe(perf_counter() - start)
+
+    def status(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot(),
+        }
+
+
+hashing_pool = HashingPool(
+    max_workers=env_int("HASH_WORKERS", 2),
+    max_pending=env_int("HASH_MAX_PENDING", 32),
+)
 
 
 class Argon2Hashser:
-    _hasher: PasswordHasher = PasswordHasher()
+    _hasher: PasswordHasher = PasswordHasher(**argon2_options_from_env())
 
     @staticmethod
     def create_hash(password: str) -> str:
@@ -21,3 +101,17 @@ class Argon2Hashser:
             return Argon2Hashser._hasher.verify(password_hash, password)
         except VerificationError:
             return False
+
+    @staticmethod
+    async def create_hash_async(password: str) -> str:
+        """
+        Hash a password on the hashing pool.
+        """
+        return await hashing_pool.run(Argon2Hashser.create_hash, password)
+
+    @staticmethod
+    async def verify_async(password_hash: str, password: str) -> bool:
+        """
+        Verify a password against a hash on the hashing pool.
+        """
+        return await hashing_pool.run(Argon2Hashser.verify, password_hash, password)
@@ -0,0 +1,57 @@
+from typing import Annotated
+
+from fastapi import Query
+from sqlalchemy import ColumnElement, Select, String, func, literal, literal_column, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+searchTerm = Annotated[
+    str,
+    Query(
+        min_length=2,
+        max_length=100,
+        description="Part of a name, email, phone or RNC. Results are ranked by trigram similarity.",
+    ),
+]
+searchLimit = Annotated[int, Query(ge=1, le=50)]
+
+# Rendered inline rather than bound, so the expression matches the trigram
+# index built on it by the search migration.
+SPACE = literal_column("' '", String)
+
+
+def search_document(*columns: InstrumentedAttribute) -> ColumnElement:
+    """
+    The searched columns joined by spaces: `a || ' ' || b || ...`.
+    """
+    document = columns[0]
+    for column in columns[1:]:
+        document = document + SPACE + column
+    return document
+
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_query(
+    query: Select,
+    document: ColumnElement,
+    term: str,
+    dialect: str,
+    key: InstrumentedAttribute,
+) -> Select:
+    """
+    Restrict `query` to rows whose document contains `term` and rank them.
+
+    On PostgreSQL a row also matches when a word of the document is similar to
+    the term (pg_trgm's `<%`), and rows are ordered by word_similarity; both
+    conditions are served by the GIN trigram index on the document. Other
+    databases get the substring match only, ordered by key.
+    """
+    contains = document.ilike(f"%{escape_like(term)}%", escape="\\")
+    if dialect != "postgresql":
+        return query.where(contains).order_by(key)
+    similar = literal(term).op("<%")(document)
+    rank = func.word_similarity(term, document)
+    return query.where(or_(contains, similar)).order_by(rank.desc(), key)
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache
+def adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, content: Any) -> bytes:
+    """
+    Validate `content`, ORM objects included, against `schema` and serialize
+    it to JSON in a single pass through pydantic-core.
+    """
+    schema_adapter = adapter(schema)
+    value = schema_adapter.validate_python(content, from_attributes=True)
+    return schema_adapter.dump_json(value)
+
+
+def json_response(
+    schema: Any, content: Any, response: Optional[Response] = None
+) -> Response:
+    """
+    Serialize `content` with `dump_json`, bypassing FastAPI's response_model
+    handling, which validates, converts to Python objects and encodes again.
+    Headers set on the injected `response` (ETag, cookies) are carried over.
+    """
+    json = Response(dump_json(schema, content), media_type="application/json")
+    if response is not None:
+        json.headers.raw.extend(response.headers.raw)
+    return json
@@ -0,0 +1,127 @@
+"""
+Refreshing the cuenta summary behind GET /cuentas/summary.
+
+On PostgreSQL `cuentas_resumen` is a materialized view, refreshed
+CONCURRENTLY so reads are never blocked. Elsewhere, e.g. the SQLite test
+database, it is a table rebuilt from `summary_query`.
+
+CUENTA_SUMMARY_MAX_AGE: seconds after which a read schedules a refresh on the
+    primary, run once the response is sent. One worker at a time refreshes;
+    reads keep being served the current rows meanwhile.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import Select, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...config import env_int
+from ...database import SessionLocal
+from ...models import (
+    ClienteEmpresa,
+    Cuenta,
+    CuentaResumen,
+    CuentaServicio,
+    SummaryRefresh,
+    TagServicio,
+)
+
+
+MAX_AGE = timedelta(seconds=env_int("CUENTA_SUMMARY_MAX_AGE", 60))
+
+# pg_try_advisory_xact_lock key held while refreshing.
+REFRESH_LOCK = 0x637565
+SUMMARY = "cuentas_resumen"
+REFRESH = text("REFRESH MATERIALIZED VIEW CONCURRENTLY cuentas_resumen")
+# Held while this worker refreshes, so stale reads do not queue up refreshes.
+refreshing = asyncio.Lock()
+
+
+def summary_query() -> Select:
+    """
+    The rows of the summary. Must match the view in migration 3d9a6e1f5b27.
+    """
+    cuentas, links = Cuenta.__table__, CuentaServicio.__table__
+    tagged = TagServicio.__table__
+    servicios = (
+        select(func.count())
+        .where(links.c.cuenta_id == cuentas.c.cuenta_id)
+        .scalar_subquery()
+    )
+    clientes = (
+        select(func.count())
+        .where(ClienteEmpresa.__table__.c.rnc == cuentas.c.rnc)
+        .scalar_subquery()
+    )
+    tags = (
+        select(func.count(tagged.c.tag_id.distinct()))
+        .select_from(links.join(tagged, tagged.c.servicio_id == links.c.servicio_id))
+        .where(links.c.cuenta_id == cuentas.c.cuenta_id)
+        .scalar_subquery()
+    )
+    return select(
+        cuentas.c.cuenta_id,
+        cuentas.c.rnc,
+        cuentas.c.organizacion_id,
+        cuentas.c.created_at,
+        servicios.label("servicios"),
+        clientes.label("clientes"),
+        tags.label("tags"),
+    )
+
+
+async def refreshed_at(db: AsyncSession) -> Optional[datetime]:
+    value = await db.scalar(
+        select(SummaryRefresh.refreshed_at).where(SummaryRefresh.name == SUMMARY)
+    )
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+async def refresh_summary(db: AsyncSession) -> None:
+    """
+    Recompute every organizacion's summary rows, record the time and commit.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        locked = await db.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK)))
+        if not locked:
+            return
+        await db.execute(REFRESH)
+    else:
+        table, rows = CuentaResumen.__table__, summary_query()
+        await db.execute(delete(table))
+        await db.execute(
+            insert(table).from_select([c.name for c in rows.selected_columns], rows)
+        )
+    await db.merge(
+        SummaryRefresh(name=SUMMARY, refreshed_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+
+
+async def refresh_on_primary() -> None:
+    """
+    Refresh through a session of its own on the primary; replicas only see
+    the view change once the primary's refresh is replicated.
+    """
+    if refreshing.locked():
+        return
+    async with refreshing, SessionLocal() as db:
+        await refresh_summary(db)
+
+
+async def schedule_refresh(
+    db: AsyncSession, background_tasks: BackgroundTasks
+) -> Optional[datetime]:
+    """
+    Refresh the summary after the response if it is older than
+    CUENTA_SUMMARY_MAX_AGE. The request itself only reads. Returns when the
+    rows about to be served were computed.
+    """
+    last = await refreshed_at(db)
+    if last is None or datetime.now(timezone.utc) - last > MAX_AGE:
+        background_tasks.add_task(refresh_on_primary)
+    return last
@@ -0,0 +1,122 @@
+"""
+Version queries for the detail endpoints, matched to the loading plans in
+loading.py.
+
+A version is one row of timestamps and counts covering every row a response
+serializes: the root's updated_at and, per relationship, the number of link
+rows, their latest created_at and the latest updated_at of the linked rows.
+Adding, removing or swapping a link, or editing any serialized row, changes
+the version, which is much cheaper to read than the response itself.
+"""
+from sqlalchemy import Select, func, select, true
+
+from ...models import (
+    Cliente,
+    ClienteEmpresa,
+    Cuenta,
+    CuentaServicio,
+    Empresa,
+    Servicio,
+    Tag,
+    TagServicio,
+)
+
+
+def links(link, target, *where):
+    return (
+        select(func.count(), func.max(link.created_at), func.max(target.updated_at))
+        .where(*where)
+        .subquery()
+    )
+
+
+def latest(column, *where):
+    return select(func.max(column)).where(*where).subquery()
+
+
+def version(root, *where, components=()) -> Select:
+    query = select(root.updated_at, *(c for sub in components for c in sub.c))
+    query = query.select_from(root)
+    # Each component is a single aggregate row, so joining on TRUE keeps one row.
+    for sub in components:
+        query = query.join(sub, true())
+    return query.where(*where)
+
+
+# loading.servicio: tags
+def servicio(servicio_id) -> Select:
+    tags = links(
+        TagServicio,
+        Tag,
+        TagServicio.servicio_id == servicio_id,
+        TagServicio.tag_id == Tag.tag_id,
+    )
+    return version(Servicio, Servicio.servicio_id == servicio_id, components=[tags])
+
+
+# loading.tag: servicios
+def tag(tag_id) -> Select:
+    servicios = links(
+        TagServicio,
+        Servicio,
+        TagServicio.tag_id == tag_id,
+        TagServicio.servicio_id == Servicio.servicio_id,
+    )
+    return version(Tag, Tag.tag_id == tag_id, components=[servicios])
+
+
+# loading.cliente_detail: empresas
+def cliente_detail(cliente_id) -> Select:
+    empresas = links(
+        ClienteEmpresa,
+        Empresa,
+        ClienteEmpresa.cliente_id == cliente_id,
+        ClienteEmpresa.rnc == Empresa.rnc,
+    )
+    return version(Cliente, Cliente.cliente_id == cliente_id, components=[empresas])
+
+
+# loading.empresa: relacionados, cuenta -> servicios -> tags
+def empresa(rnc) -> Select:
+    relacionados = links(
+        ClienteEmpresa,
+        Cliente,
+        ClienteEmpresa.rnc == rnc,
+        ClienteEmpresa.cliente_id == Cliente.cliente_id,
+    )
+    cuenta = latest(Cuenta.updated_at, Cuenta.rnc == rnc)
+    servicios = links(
+        CuentaServicio,
+        Servicio,
+        Cuenta.rnc == rnc,
+        CuentaServicio.cuenta_id == Cuenta.cuenta_id,
+        CuentaServicio.servicio_id == Servicio.servicio_id,
+    )
+    tags = links(
+        TagServicio,
+        Tag,
+        Cuenta.rnc == rnc,
+        CuentaServicio.cuenta_id == Cuenta.cuenta_id,
+        TagServicio.servicio_id == CuentaServicio.servicio_id,
+        TagServicio.tag_id == Tag.tag_id,
+    )
+    return version(
+        Empresa, Empresa.rnc == rnc, components=[relacionados, cuenta, servicios, tags]
+    )
+
+
+# loading.cuenta_detail: empresa -> relacionados
+def cuenta_detail(cuenta_id) -> Select:
+    empresa = latest(
+        Empresa.updated_at, Cuenta.cuenta_id == cuenta_id, Empresa.rnc == Cuenta.rnc
+    )
+    relacionados = links(
+        ClienteEmpresa,
+        Cliente,
+        Cuenta.cuenta_id == cuenta_id,
+        ClienteEmpresa.rnc == Cuenta.rnc,
+        ClienteEmpresa.cliente_id == Cliente.cliente_id,
+    )
+    return version(
+        Cuenta, Cuenta.cuenta_id == cuenta_id, components=[empresa, relacionados]
+    )
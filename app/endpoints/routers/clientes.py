@@ -1,20 +1,48 @@
-from typing import Any, Annotated
-from uuid import UUID
+from typing import Annotated, Union
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
 from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.exc import StaleDataError
 
-from ..dependencies import auth
+from ..dependencies import auth, filtering, loading, versions
+from ..dependencies.bulk import import_records, import_request_body
+from ..dependencies.batch import fetch_batch, idsQuery
 from ..dependencies.common import errorResponses
+from ..dependencies.constants import CACHE_CONTROL_ENTITY
+from ..dependencies.etag import conditional_get
+from ..dependencies.fieldsets import Selection, cliente_fields
+from ..dependencies.export import export_response
+from ..dependencies.pagination import fetch_page
+from ..dependencies.search import (
+    search_document,
+    search_query,
+    searchLimit,
+    searchTerm,
+)
+from ..dependencies.serialization import json_response
 from ...database import get_db
-from ...models import Cliente as dbCliente
-from ...schemas.cliente_empresa import Cliente, ClienteCreate, ClienteUpdate
+from ...models import Cliente as dbCliente, lazy_utc_now
+from ...schemas.batch import BatchResponse
+from ...schemas.bulk import ImportReport
+from ...schemas.cliente_empresa import (
+    Cliente,
+    ClienteCreate,
+    ClienteDetail,
+    ClienteImport,
+    ClienteInDB,
+    ClienteUpdate,
+)
+from ...schemas.export import ExportFormat
+from ...schemas.filters import ClienteFilters
+from ...schemas.search import SearchResults
 from ...schemas.pagination import PagintationParams, PaginatedResponse
 
 
-router = APIRouter(responses=errorResponses, dependencies=[Depends(auth.get_user)])
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
 
 client_id_metadata = {
     "title": "Client ID",
@@ -22,72 +50,138 @@ client_id_metadata = {
 }
 
 pagintationParams = Annotated[PagintationParams, Depends()]
-SessionLocal = Annotated[Session, Depends(get_db)]
+clienteFilters = Annotated[ClienteFilters, Depends()]
+clienteFields = Annotated[Selection, Depends(cliente_fields.selection)]
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
 
 
-def paginate(pagination_parms: PagintationParams, data: list[Any]):
-    """Build Paginataded Response"""
-    response = PaginatedResponse(
-        total=len(data),
-        offset=pagination_parms.offset,
-        limit=pagination_parms.limit,
-        items=data,
-    )
-    if len(data) == pagination_parms.limit:
-        response.next_offset = pagination_parms.offset + pagination_parms.offset
-    return response
+@router.get("/export")
+async def export_clients(db: SessionLocal, format: ExportFormat = ExportFormat.ndjson):
+    """
+    Download every client as NDJSON or CSV, streamed as it is read.
+    """
+    query = select(
+        dbCliente.cliente_id,
+        dbCliente.nombre,
+        dbCliente.email,
+        dbCliente.telefono,
+        dbCliente.created_at,
+        dbCliente.updated_at,
+    ).order_by(dbCliente.created_at, dbCliente.cliente_id)
+    return export_response(db, query, format, "clientes")
+
+
+@router.get("/search", response_model=SearchResults[ClienteInDB])
+async def search_clients(q: searchTerm, db: SessionLocal, limit: searchLimit = 20):
+    """
+    Find clients by part of their name, email or phone, best match first.
+    """
+    document = search_document(dbCliente.nombre, dbCliente.email, dbCliente.telefono)
+    dialect = db.get_bind().dialect.name
+    query = search_query(select(dbCliente), document, q, dialect, dbCliente.cliente_id)
+    items = (await db.scalars(query.limit(limit))).all()
+    return json_response(SearchResults[ClienteInDB], {"query": q, "items": items})
 
 
-@router.get("/{cliente_id}")
+@router.get("/{cliente_id}", response_model=ClienteDetail)
 async def get_client(
     cliente_id: Annotated[UUID, Path(**client_id_metadata)],
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve information about a specific client.
     """
-
-    load_empresas = selectinload(dbCliente.empresas)
+    await conditional_get(
+        db,
+        request,
+        response,
+        versions.cliente_detail(cliente_id),
+        CACHE_CONTROL_ENTITY,
+    )
     query = (
         select(dbCliente)
-        .options(load_empresas)
+        .options(*loading.cliente_detail)
         .where(dbCliente.cliente_id == cliente_id)
     )
-    cliente = db.scalars(query).first()
+    cliente = (await db.scalars(query)).first()
     if cliente is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    return cliente
+    return json_response(ClienteDetail, cliente, response)
 
 
 @router.get("")
 async def get_multiple_clients(
-    params: pagintationParams, db: SessionLocal
-) -> PaginatedResponse[Cliente]:
+    params: pagintationParams,
+    filters: clienteFilters,
+    selection: clienteFields,
+    db: SessionLocal,
+    ids: idsQuery = None,
+) -> Union[PaginatedResponse[Cliente], BatchResponse[Cliente]]:
     """
     Retrieve information about multiple client.
+    With `ids`, return those clients in request order instead of a page.
     """
-    query = select(dbCliente).offset(params.offset).limit(params.limit)
-    clients = db.scalars(query).all()
-    response = paginate(params, clients)
-    return response
+    schema = cliente_fields.response_schema(selection)
+    if ids is not None:
+        query = select(dbCliente).options(*cliente_fields.options(selection))
+        batch = await fetch_batch(db, query, dbCliente.cliente_id, ids)
+        return json_response(BatchResponse[schema], batch)
+    sort = filtering.sort_column(dbCliente, filters)
+    query = select(dbCliente).options(*cliente_fields.options(selection, sort))
+    query = filtering.cliente(query, filters)
+    page = await fetch_page(
+        db, query, params, sort, dbCliente.cliente_id, filtering.descending(filters)
+    )
+    return json_response(PaginatedResponse[schema], page)
 
 
 @router.post("")
-async def create_client(input_cliente: ClienteCreate, db: Session = Depends(get_db)):
+async def create_client(
+    input_cliente: ClienteCreate, db: AsyncSession = Depends(get_db)
+):
     """
     Create a new client.
     """
     cliente = dbCliente(**input_cliente.model_dump())
     db.add(cliente)
-    db.commit()
-    db.refresh(cliente)
+    await db.commit()
+    await db.refresh(cliente)
     return cliente
 
 
+def cliente_row(record: dict) -> dict:
+    cliente = ClienteImport.model_validate(record)
+    now = lazy_utc_now()
+    return {
+        "cliente_id": cliente.cliente_id or uuid4(),
+        "nombre": cliente.nombre,
+        "email": cliente.email,
+        "telefono": cliente.telefono,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@router.post("/import", openapi_extra=import_request_body)
+async def import_clients(
+    request: Request, db: SessionLocal, format: ExportFormat = ExportFormat.ndjson
+) -> ImportReport:
+    """
+    Create or update clients in bulk from an NDJSON or CSV request body.
+    Rows carrying a cliente_id update that client. Invalid rows are reported
+    and skipped without aborting the load.
+    """
+    return await import_records(
+        db, request.stream(), format, dbCliente.__table__, "cliente_id", cliente_row
+    )
+
+
 @router.put("/{cliente_id}")
 async def update_client(
     updated_client: ClienteUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     cliente_id: UUID = Path(**client_id_metadata),
 ):
     """
@@ -100,8 +194,8 @@ async def update_client(
             .values(**updated_client.model_dump(exclude_unset=True))
             .returning(dbCliente)
         )
-        cliente = db.scalars(stmt).first()
-        db.commit()
+        cliente = (await db.scalars(stmt)).first()
+        await db.commit()
     except StaleDataError:
         raise HTTPException(status_code=404, detail="A Tag was not found")
     return cliente
@@ -109,7 +203,7 @@ async def update_client(
 
 @router.delete("/{cliente_id}")
 async def delete_client(
-    cliente_id: UUID = Path(**client_id_metadata), db: Session = Depends(get_db)
+    cliente_id: UUID = Path(**client_id_metadata), db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific client.
@@ -119,8 +213,8 @@ async def delete_client(
         .where(dbCliente.cliente_id == cliente_id)
         .returning(dbCliente.cliente_id)
     )
-    deleted_cliente = db.scalars(stmt).first()
+    deleted_cliente = (await db.scalars(stmt)).first()
     if deleted_cliente is None:
         raise HTTPException(status_code=404, detail="Cliente not found")
-    db.commit()
+    await db.commit()
     return {"message": f"Cliente id={deleted_cliente} deleted successfully"}
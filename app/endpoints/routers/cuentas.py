@@ -1,73 +1,132 @@
-from typing import Any, Annotated
+from datetime import timezone
+from email.utils import format_datetime
+from typing import Annotated, Union
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Path,
+    Request,
+    Response,
+)
 from sqlalchemy import select, delete
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import auth
-from ..dependencies.common import errorResponses
+from ..dependencies import auth, filtering, loading, summary, versions
+from ..dependencies.catalog import existing_ids
+from ..dependencies.batch import fetch_batch, idsQuery
+from ..dependencies.common import errorResponses, foreign_key_violation
+from ..dependencies.constants import CACHE_CONTROL_ENTITY
+from ..dependencies.etag import conditional_get
+from ..dependencies.fieldsets import Selection, cuenta_fields
+from ..dependencies.pagination import fetch_page
+from ..dependencies.serialization import json_response
 from ...database import get_db
 from ...models import (
     Servicio as dbServicio,
     Cuenta as dbCuenta,
     Empresa as dbEmpresa,
+    CuentaResumen as dbCuentaResumen,
     CuentaServicio as dbCuentaServicio,
 )
-from ...schemas.cuenta import CuentaNew
+from ...schemas.batch import BatchResponse
+from ...schemas.cuenta import Cuenta, CuentaDetail, CuentaNew, CuentaSummary
+from ...schemas.filters import CuentaFilters
 from ...schemas.pagination import PagintationParams, PaginatedResponse
 
 
-router = APIRouter(responses=errorResponses, dependencies=[Depends(auth.get_user)])
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
 pagintationParams = Annotated[PagintationParams, Depends()]
-SessionLocal = Annotated[Session, Depends(get_db)]
+cuentaFilters = Annotated[CuentaFilters, Depends()]
+cuentaFields = Annotated[Selection, Depends(cuenta_fields.selection)]
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
 cuenta_id_metadata = {
     "title": "Cuenta id",
     "description": "The unique identifier for the Cuenta.",
 }
 
 
-@router.get("/{cuenta_id}")
+@router.get("/summary", response_model=PaginatedResponse[CuentaSummary])
+async def get_cuentas_summary(
+    params: pagintationParams,
+    db: SessionLocal,
+    response: Response,
+    background_tasks: BackgroundTasks,
+):
+    """
+    Servicio, cliente and tag counts per cuenta, read from the precomputed
+    summary, which trails writes by about CUENTA_SUMMARY_MAX_AGE seconds.
+    Last-Modified tells when the counts were computed.
+    """
+    refreshed_at = await summary.schedule_refresh(db, background_tasks)
+    if refreshed_at is not None:
+        response.headers["Last-Modified"] = format_datetime(
+            refreshed_at.astimezone(timezone.utc), usegmt=True
+        )
+    page = await fetch_page(
+        db,
+        select(dbCuentaResumen),
+        params,
+        dbCuentaResumen.created_at,
+        dbCuentaResumen.cuenta_id,
+    )
+    return json_response(PaginatedResponse[CuentaSummary], page, response)
+
+
+@router.get("/{cuenta_id}", response_model=CuentaDetail)
 async def get_tag(
-    cuenta_id: int = Path(**cuenta_id_metadata), db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cuenta_id: UUID = Path(**cuenta_id_metadata),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve information about a single cuenta.
     """
-    load_relacionados = selectinload(dbCuenta.empresa).subqueryload(
-        dbEmpresa.relacionados
+    await conditional_get(
+        db, request, response, versions.cuenta_detail(cuenta_id), CACHE_CONTROL_ENTITY
     )
     query = (
         select(dbCuenta)
-        .options(load_relacionados)
+        .options(*loading.cuenta_detail)
         .where(dbCuenta.cuenta_id == cuenta_id)
     )
-    cuenta = db.scalars(query).first()
+    cuenta = (await db.scalars(query)).first()
     if cuenta is None:
         raise HTTPException(status_code=404, detail="Tag not found")
-    cuenta.empresa
-    return cuenta
+    return json_response(CuentaDetail, cuenta, response)
 
 
-@router.get("")
-async def get_cuentas(params: pagintationParams, db: SessionLocal):
+@router.get("", response_model=Union[PaginatedResponse[Cuenta], BatchResponse[Cuenta]])
+async def get_cuentas(
+    params: pagintationParams,
+    filters: cuentaFilters,
+    selection: cuentaFields,
+    db: SessionLocal,
+    ids: idsQuery = None,
+):
     """
     Retrieve a multiple cuentas with pagination.
+    With `ids`, return those cuentas in request order instead of a page.
     """
-    load_relacionados = selectinload(dbCuenta.empresa).subqueryload(
-        dbEmpresa.relacionados
+    schema = cuenta_fields.response_schema(selection)
+    if ids is not None:
+        query = select(dbCuenta).options(*cuenta_fields.options(selection))
+        batch = await fetch_batch(db, query, dbCuenta.cuenta_id, ids)
+        return json_response(BatchResponse[schema], batch)
+    sort = filtering.sort_column(dbCuenta, filters)
+    query = select(dbCuenta).options(*cuenta_fields.options(selection, sort))
+    query = filtering.cuenta(query, filters)
+    page = await fetch_page(
+        db, query, params, sort, dbCuenta.cuenta_id, filtering.descending(filters)
     )
-    load_servicios = selectinload(dbCuenta.servicios).subqueryload(dbServicio.tags)
-    query = (
-        select(dbCuenta)
-        .options(load_relacionados)
-        .options(load_servicios)
-        .offset(params.offset)
-        .limit(params.limit)
-    )
-    cuentas = db.scalars(query).all()
-    # response = paginate(params, cuentas)
-    return cuentas
+    return json_response(PaginatedResponse[schema], page)
 
 
 @router.post("")
@@ -75,22 +134,31 @@ async def create_cuenta(new_cuenta: CuentaNew, db: SessionLocal):
     """
     Create a new cuenta.
     """
+    # empresas.rnc is shared by all organizaciones; read it through the scoped
+    # session so only the caller's own empresas can get a cuenta.
+    empresa = await db.scalar(
+        select(dbEmpresa.rnc).where(dbEmpresa.rnc == new_cuenta.rnc)
+    )
+    if empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa not found")
     try:
         cuenta = dbCuenta(**new_cuenta.model_dump(exclude=["servicios"]))
-        query = select(dbServicio).where(
-            dbServicio.servicio_id.in_(new_cuenta.servicios)
-        )
-        servicios = db.scalars(query).all()
+        servicios = await existing_ids(db, dbServicio.servicio_id, new_cuenta.servicios)
         all_services_exist = len(servicios) == len(new_cuenta.servicios)
         if not all_services_exist:
             raise HTTPException(status_code=404, detail="Some services were not found")
-        for s in servicios:
-            cuenta_servicio = dbCuentaServicio(servicio_id=s.servicio_id)
+        for servicio_id in servicios:
+            cuenta_servicio = dbCuentaServicio(servicio_id=servicio_id)
             cuenta.cuenta_servicios.append(cuenta_servicio)
         db.add(cuenta)
-        db.commit()
-        db.refresh(cuenta)
-    except IntegrityError:
+        await db.commit()
+        await db.refresh(cuenta)
+    except IntegrityError as e:
+        if foreign_key_violation(e):
+            # Deleted since they were checked, e.g. by another request.
+            raise HTTPException(
+                status_code=404, detail="Empresa or some services were not found"
+            )
         raise HTTPException(
             status_code=422, detail="Empresa cannot have multiple cuentas"
         )
@@ -99,7 +167,7 @@ async def create_cuenta(new_cuenta: CuentaNew, db: SessionLocal):
 
 @router.delete("/{cuenta_id}")
 async def delete_cuenta(
-    cuenta_id: int = Path(**cuenta_id_metadata), db: Session = Depends(get_db)
+    cuenta_id: UUID = Path(**cuenta_id_metadata), db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific cuenta.
@@ -109,21 +177,8 @@ async def delete_cuenta(
         .where(dbCuenta.cuenta_id == cuenta_id)
         .returning(dbCuenta.cuenta_id)
     )
-    deleted_cuenta = db.scalars(stmt).first()
+    deleted_cuenta = (await db.scalars(stmt)).first()
     if deleted_cuenta is None:
         raise HTTPException(status_code=404, detail=f"Tag id={cuenta_id} not found")
-    db.commit()
+    await db.commit()
     return {"message": f"Servicio id={deleted_cuenta} deleted successfully"}
-
-
-def paginate(pagination_parms: PagintationParams, data: list[Any]):
-    """Build Paginataded Response"""
-    response = PaginatedResponse(
-        total=len(data),
-        offset=pagination_parms.offset,
-        limit=pagination_parms.limit,
-        items=data,
-    )
-    if len(data) == pagination_parms.limit:
-        response.next_offset = pagination_parms.offset + pagination_parms.offset
-    return response
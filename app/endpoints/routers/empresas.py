@@ -1,53 +1,137 @@
-from typing import Any, Annotated
+from typing import Annotated, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
 from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.exc import StaleDataError
 
+from ..dependencies.bulk import (
+    RowRejected,
+    import_records,
+    import_request_body,
+)
+from ..dependencies.batch import fetch_batch, idsQuery
 from ..dependencies.common import errorResponses
-from ..dependencies import auth
+from ..dependencies.constants import CACHE_CONTROL_ENTITY
+from ..dependencies.etag import conditional_get
+from ..dependencies.fieldsets import Selection, empresa_fields
+from ..dependencies.export import export_response
+from ..dependencies.pagination import fetch_page
+from ..dependencies.search import (
+    search_document,
+    search_query,
+    searchLimit,
+    searchTerm,
+)
+from ..dependencies.serialization import json_response
+from ..dependencies import auth, filtering, loading, versions
 from ...database import get_db
 from ...models import (
     Empresa as dbEmpresa,
     Cliente as dbCliente,
+    lazy_utc_now,
 )
-from ...schemas.cliente_empresa import Empresa, EmpresaCreate, EmpresaUpdate
+from ...schemas.batch import BatchResponse
+from ...schemas.bulk import ImportReport
+from ...schemas.cliente_empresa import (
+    Empresa,
+    EmpresaCreate,
+    EmpresaInDB,
+    EmpresaUpdate,
+)
+from ...schemas.export import ExportFormat
+from ...schemas.filters import EmpresaFilters
+from ...schemas.search import SearchResults
 from ...schemas.pagination import PagintationParams, PaginatedResponse
 
 
-router = APIRouter(responses=errorResponses, dependencies=[Depends(auth.get_user)])
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
 pagintationParams = Annotated[PagintationParams, Depends()]
-SessionLocal = Annotated[Session, Depends(get_db)]
+empresaFilters = Annotated[EmpresaFilters, Depends()]
+empresaFields = Annotated[Selection, Depends(empresa_fields.selection)]
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
 empresa_id_metadata = {
     "title": "Empresa RNC",
     "description": "The unique identifier for the Empresa.",
 }
 
 
+@router.get("/export")
+async def export_empresas(db: SessionLocal, format: ExportFormat = ExportFormat.ndjson):
+    """
+    Download every Empresa as NDJSON or CSV, streamed as it is read.
+    """
+    query = select(
+        dbEmpresa.rnc,
+        dbEmpresa.nombre,
+        dbEmpresa.tipo_de_persona,
+        dbEmpresa.created_at,
+        dbEmpresa.updated_at,
+    ).order_by(dbEmpresa.created_at, dbEmpresa.rnc)
+    return export_response(db, query, format, "empresas")
+
+
+@router.get("/search", response_model=SearchResults[EmpresaInDB])
+async def search_empresas(q: searchTerm, db: SessionLocal, limit: searchLimit = 20):
+    """
+    Find Empresas by part of their name or RNC, best match first.
+    """
+    document = search_document(dbEmpresa.nombre, dbEmpresa.rnc)
+    dialect = db.get_bind().dialect.name
+    query = search_query(select(dbEmpresa), document, q, dialect, dbEmpresa.rnc)
+    items = (await db.scalars(query.limit(limit))).all()
+    return json_response(SearchResults[EmpresaInDB], {"query": q, "items": items})
+
+
 @router.get("/{rnc}", response_model=Empresa)
 async def get_empresa(
-    rnc: str = Path(**empresa_id_metadata), db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    rnc: str = Path(**empresa_id_metadata),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve information about a single Empresa.
     """
-    query = select(dbEmpresa).where(dbEmpresa.rnc == rnc)
-    empresa = db.scalars(query).first()
+    await conditional_get(
+        db, request, response, versions.empresa(rnc), CACHE_CONTROL_ENTITY
+    )
+    query = select(dbEmpresa).options(*loading.empresa).where(dbEmpresa.rnc == rnc)
+    empresa = (await db.scalars(query)).first()
     if empresa is None:
         raise HTTPException(status_code=404, detail="Empresa not found")
-    return empresa
+    return json_response(Empresa, empresa, response)
 
 
-@router.get("", response_model=PaginatedResponse[Empresa])
-async def get_multiple_empresas(params: pagintationParams, db: SessionLocal):
+@router.get(
+    "", response_model=Union[PaginatedResponse[Empresa], BatchResponse[Empresa]]
+)
+async def get_multiple_empresas(
+    params: pagintationParams,
+    filters: empresaFilters,
+    selection: empresaFields,
+    db: SessionLocal,
+    rnc: idsQuery = None,
+):
     """
     Retrieve multiple empresas with pagination.
+    With `rnc`, return those empresas in request order instead of a page.
     """
-    query = select(dbEmpresa).offset(params.offset).limit(params.limit)
-    empresas = db.scalars(query).all()
-    response = paginate(params, empresas)
-    return response
+    schema = empresa_fields.response_schema(selection)
+    if rnc is not None:
+        query = select(dbEmpresa).options(*empresa_fields.options(selection))
+        batch = await fetch_batch(db, query, dbEmpresa.rnc, rnc)
+        return json_response(BatchResponse[schema], batch)
+    sort = filtering.sort_column(dbEmpresa, filters)
+    query = select(dbEmpresa).options(*empresa_fields.options(selection, sort))
+    query = filtering.empresa(query, filters)
+    page = await fetch_page(
+        db, query, params, sort, dbEmpresa.rnc, filtering.descending(filters)
+    )
+    return json_response(PaginatedResponse[schema], page)
 
 
 @router.post("")
@@ -59,15 +143,51 @@ async def create_empresa(input_emrpesa: EmpresaCreate, db: SessionLocal):
     query = select(dbCliente).where(
         dbCliente.cliente_id.in_(input_emrpesa.relacionados)
     )
-    clientes = db.scalars(query).all()
+    clientes = (await db.scalars(query)).all()
     for c in clientes:
         empresa.relacionados.add(c)
     db.add(empresa)
-    db.commit()
-    db.refresh(empresa)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # rnc is unique across organizaciones; the answer must not reveal
+        # whether the taken rnc is the caller's or another organizacion's.
+        raise HTTPException(
+            status_code=409, detail="An Empresa with that rnc already exists"
+        )
+    await db.refresh(empresa)
     return empresa
 
 
+def empresa_row(record: dict) -> dict:
+    empresa = EmpresaCreate.model_validate(record)
+    if empresa.relacionados:
+        raise RowRejected(
+            "relacionados are not imported, link clients through POST /empresas"
+        )
+    now = lazy_utc_now()
+    return {
+        "rnc": empresa.rnc,
+        "nombre": empresa.nombre,
+        "tipo_de_persona": empresa.tipo_de_persona.value,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@router.post("/import", openapi_extra=import_request_body)
+async def import_empresas(
+    request: Request, db: SessionLocal, format: ExportFormat = ExportFormat.ndjson
+) -> ImportReport:
+    """
+    Create or update Empresas in bulk, by rnc, from an NDJSON or CSV request
+    body. Invalid rows are reported and skipped without aborting the load.
+    """
+    return await import_records(
+        db, request.stream(), format, dbEmpresa.__table__, "rnc", empresa_row
+    )
+
+
 @router.put("/{rnc}")
 async def update_empresa(
     updated_empresa: EmpresaUpdate,
@@ -84,8 +204,8 @@ async def update_empresa(
             .values(**updated_empresa.model_dump(exclude_unset=True))
             .returning(dbEmpresa)
         )
-        empresa = db.scalars(stmt).first()
-        db.commit()
+        empresa = (await db.scalars(stmt)).first()
+        await db.commit()
     except StaleDataError:
         raise HTTPException(status_code=404, detail="Empresa not found")
     return empresa
@@ -93,27 +213,14 @@ async def update_empresa(
 
 @router.delete("/{rnc}")
 async def delete_empresa(
-    rnc: str = Path(**empresa_id_metadata), db: Session = Depends(get_db)
+    rnc: str = Path(**empresa_id_metadata), db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific Empresa.
     """
     stmt = delete(dbEmpresa).where(dbEmpresa.rnc == rnc).returning(dbEmpresa.rn)
-    deleted_empresa = db.scalars(stmt).first()
+    deleted_empresa = (await db.scalars(stmt)).first()
     if deleted_empresa is None:
         raise HTTPException(status_code=404, detail="Cliente not found")
-    db.commit()
+    await db.commit()
     return {"message": f"Empresa rnc={deleted_empresa} deleted successfully"}
-
-
-def paginate(pagination_parms: PagintationParams, data: list[Any]):
-    """Build Paginataded Response"""
-    response = PaginatedResponse(
-        total=len(data),
-        offset=pagination_parms.offset,
-        limit=pagination_parms.limit,
-        items=data,
-    )
-    if len(data) == pagination_parms.limit:
-        response.next_offset = pagination_parms.offset + pagination_parms.offset
-    return response
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..dependencies import auth
+from ..dependencies.catalog import catalog_cache
+from ..dependencies.common import errorResponses
+from ..dependencies.password import hashing_pool
+from ...database import engine, pool_status
+from ...metrics import exposition, request_metrics
+from ...schemas.metrics import PoolStatus, HashingStatus
+
+
+router = APIRouter(responses=errorResponses)
+
+
+@router.get("/pool", response_model=PoolStatus, dependencies=[Depends(auth.get_user)])
+async def get_pool_status():
+    """
+    Retrieve connection pool statistics for the database engine.
+    """
+    return pool_status(engine.pool)
+
+
+@router.get(
+    "/hashing", response_model=HashingStatus, dependencies=[Depends(auth.get_user)]
+)
+async def get_hashing_status():
+    """
+    Retrieve queue depth and latency of the password hashing pool.
+    """
+    return hashing_pool.status()
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(auth.require_metrics_token)],
+)
+async def get_metrics():
+    """
+    Request and connection pool metrics in the Prometheus text format.
+    Authenticated with the static METRICS_TOKEN rather than a user token.
+    """
+    return PlainTextResponse(
+        exposition(request_metrics, engine.pool, [catalog_cache]),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -33,8 +33,8 @@ async def create_organizacion(new_organizacion: OrganizacionCreate, db: sessionD
     # miembro = dbOrgUsuario(usuario_id=current_user.usuario_id)
     # organizacion.organizacion_usuarios.append(miembro)
     db.add(organizacion)
-    db.commit()
-    db.refresh(organizacion)
+    await db.commit()
+    await db.refresh(organizacion)
     return organizacion
 
 
@@ -52,7 +52,7 @@ async def get_my_organizaciones(
         .subquery()
     )
     query = select(dbOrganizacion).join(subquery)
-    organizaciones = db.scalars(query).fetchall()
+    organizaciones = (await db.scalars(query)).fetchall()
     return organizaciones
 
 
@@ -68,7 +68,7 @@ async def get_organizacion(
     query = select(dbOrganizacion).where(
         dbOrganizacion.organizacion_id == organizacion_id
     )
-    organizacion = db.scalars(query).first()
+    organizacion = (await db.scalars(query)).first()
     if organizacion is None:
         raise HTTPException(status_code=404, detail="Organizacion not found")
     return organizacion
@@ -89,21 +89,21 @@ async def add_user_to_organizacion(
         dbOrgUsuario.usuario_id == super_user_id,
     )
     print(super_user_id)
-    if db.scalars(exists_criteria).first() is None:
+    if (await db.scalars(exists_criteria)).first() is None:
         raise forbidden_resource
     query = select(dbOrganizacion).where(
         dbOrganizacion.organizacion_id == organizacion_id
     )
-    organizacion = db.scalars(query).first()
+    organizacion = (await db.scalars(query)).first()
     if organizacion is None:
         raise HTTPException(status_code=404, detail="Organizacion not found")
-    password = Argon2Hashser.create_hash(empleado.password)
+    password = await Argon2Hashser.create_hash_async(empleado.password)
     user = dbUsuario(
         **empleado.model_dump(exclude=["password"]),
         password=password,
         org=organizacion,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
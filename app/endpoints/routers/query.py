@@ -0,0 +1,31 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dependencies import auth, graph
+from ..dependencies.common import errorResponses
+from ..dependencies.serialization import json_response
+from ...database import get_db, read_only
+from ...schemas.batch import BatchResponse
+from ...schemas.query import GraphQuery
+
+
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
+
+
+@router.post("", response_model=BatchResponse[dict[str, Any]])
+@read_only
+async def run_query(query: GraphQuery, db: SessionLocal):
+    """
+    Read records of one resource together with any chain of related records,
+    e.g. clientes with their empresas, each empresa's cuenta and its servicios.
+    Every relationship level costs one statement, whatever the number of rows.
+    Only reads, so it is served by a replica like a GET.
+    """
+    node = graph.resolve(query)
+    result = await graph.fetch(db, node, query.ids, query.limit)
+    return json_response(BatchResponse[graph.node_schema(node)], result)
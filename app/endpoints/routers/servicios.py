@@ -1,20 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
 from sqlalchemy import select, update, delete
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.exc import StaleDataError
-from typing import List, Any, Annotated
-
-from ..dependencies.common import errorResponses
-from ..dependencies import auth
+from typing import List, Annotated, Union
+from uuid import UUID, uuid4
+
+from ..dependencies.bulk import UPSERT_CHUNK_SIZE, chunkSize, upsert_in_chunks
+from ..dependencies.catalog import cached_page, existing_ids, invalidate_catalog
+from ..dependencies.batch import fetch_batch, idsQuery
+from ..dependencies.common import errorResponses, foreign_key_violation
+from ..dependencies.serialization import json_response
+from ..dependencies.constants import CACHE_CONTROL_CATALOG
+from ..dependencies.etag import conditional_get
+from ..dependencies.fieldsets import Selection, servicio_fields
+from ..dependencies import auth, filtering, loading, versions
 from ...models import Servicio as dbServicio, TagServicio as dbTagServicio, Tag as dbTag
+from ...models import lazy_utc_now
 from ...database import get_db
+from ...schemas.batch import BatchResponse
+from ...schemas.bulk import UpsertReport
+from ...schemas.filters import ServicioFilters
 from ...schemas.pagination import PagintationParams, PaginatedResponse
-from ...schemas.servicio import Servicio, ServicioCreate, ServicioUpdate
+from ...schemas.servicio import (
+    Servicio,
+    ServicioCreate,
+    ServicioUpdate,
+    ServicioUpsert,
+)
 
 
-router = APIRouter(responses=errorResponses, dependencies=[Depends(auth.get_user)])
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
 pagintationParams = Annotated[PagintationParams, Depends()]
-SessionLocal = Annotated[Session, Depends(get_db)]
+servicioFilters = Annotated[ServicioFilters, Depends()]
+servicioFields = Annotated[Selection, Depends(servicio_fields.selection)]
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
 servicio_id_metadata = {
     "title": "Servicio id",
     "description": "The unique identifier for the Servicio.",
@@ -23,28 +46,51 @@ servicio_id_metadata = {
 
 @router.get("/{servicio_id}", response_model=Servicio)
 async def get_servicio(
-    servicio_id: int = Path(**servicio_id_metadata),
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    servicio_id: UUID = Path(**servicio_id_metadata),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve information about a specific Servicio.
     """
-    query = select(dbServicio).where(dbServicio.servicio_id == servicio_id)
-    servicio = db.scalars(query).first()
+    await conditional_get(
+        db, request, response, versions.servicio(servicio_id), CACHE_CONTROL_CATALOG
+    )
+    query = (
+        select(dbServicio)
+        .options(*loading.servicio)
+        .where(dbServicio.servicio_id == servicio_id)
+    )
+    servicio = (await db.scalars(query)).first()
     if servicio is None:
         raise HTTPException(status_code=404, detail="Servicio not found")
-    return servicio
+    return json_response(Servicio, servicio, response)
 
 
-@router.get("", response_model=PaginatedResponse[Servicio])
-async def get_multiple_servicios(params: pagintationParams, db: SessionLocal):
+@router.get(
+    "", response_model=Union[PaginatedResponse[Servicio], BatchResponse[Servicio]]
+)
+async def get_multiple_servicios(
+    params: pagintationParams,
+    filters: servicioFilters,
+    selection: servicioFields,
+    db: SessionLocal,
+    ids: idsQuery = None,
+):
     """
     Retrieve information about multiple servicios using pagination.
+    With `ids`, return those servicios in request order instead of a page.
     """
-    query = select(dbServicio).offset(params.offset).limit(params.limit)
-    servicios = db.scalars(query).all()
-    response = paginate(params, servicios)
-    return response
+    schema = servicio_fields.response_schema(selection)
+    if ids is not None:
+        query = select(dbServicio).options(*servicio_fields.options(selection))
+        batch = await fetch_batch(db, query, dbServicio.servicio_id, ids)
+        return json_response(BatchResponse[schema], batch)
+    sort = filtering.sort_column(dbServicio, filters)
+    query = select(dbServicio).options(*servicio_fields.options(selection, sort))
+    query = filtering.servicio(query, filters)
+    return await cached_page(db, query, params, filters, dbServicio.servicio_id, schema)
 
 
 @router.post("", response_model=Servicio)
@@ -53,40 +99,78 @@ async def create_servicio(new_servicio: ServicioCreate, db: SessionLocal):
     Create a new Servicio.
     """
     servicio = dbServicio(**new_servicio.model_dump(exclude={"tags"}))
-    query = select(dbTag.tag_id).where(dbTag.tag_id.in_(new_servicio.tags))
-    tags = db.scalars(query).all()
+    tags = await existing_ids(db, dbTag.tag_id, new_servicio.tags)
     for tag_id in tags:
         tag_servicio = dbTagServicio(tag_id=tag_id)
         servicio.tag_servicios.append(tag_servicio)
     db.add(servicio)
-    db.commit()
-    db.refresh(servicio)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        if not foreign_key_violation(e):
+            raise
+        # A tag deleted since it was checked, e.g. by another request.
+        raise HTTPException(status_code=404, detail="Some tags were not found")
+    await invalidate_catalog()
+    await db.refresh(servicio, ["tags"])
     return servicio
 
 
+@router.post("/upsert", response_model=UpsertReport)
+async def upsert_servicios(
+    servicios: List[ServicioUpsert],
+    db: SessionLocal,
+    chunk_size: chunkSize = UPSERT_CHUNK_SIZE,
+):
+    """
+    Create or update many servicios by id, one statement per chunk. Servicios
+    without an id are created.
+    """
+    now = lazy_utc_now()
+    rows = [
+        {
+            "servicio_id": s.servicio_id or uuid4(),
+            "nombre": s.nombre,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for s in servicios
+    ]
+    report = await upsert_in_chunks(
+        db, dbServicio.__table__, "servicio_id", rows, chunk_size
+    )
+    await invalidate_catalog()
+    return report
+
+
 @router.post("/{servicio_id}/tags", response_model=Servicio)
 async def add_tag_to_servicio(
-    tags: list[int],
+    tags: list[UUID],
     db: SessionLocal,
-    servicio_id: int = Path(**servicio_id_metadata),
+    servicio_id: UUID = Path(**servicio_id_metadata),
 ):
     """
     Retreive the tags associated with the Servicio.
     """
-    query = select(dbServicio).where(dbServicio.servicio_id == servicio_id)
-    servicio = db.scalars(query).first()
+    query = (
+        select(dbServicio)
+        .options(selectinload(dbServicio.tag_servicios))
+        .where(dbServicio.servicio_id == servicio_id)
+    )
+    servicio = (await db.scalars(query)).first()
     for tag_id in tags:
         tag_servicio = dbTagServicio(tag_id=tag_id)
         servicio.tag_servicios.append(tag_servicio)
     db.add(servicio)
-    db.commit()
-    db.refresh(servicio)
+    await db.commit()
+    await invalidate_catalog()
+    await db.refresh(servicio, ["tags"])
     return servicio
 
 
 @router.put("", response_model=dict[str, str])
 async def bulk_update_servicios(
-    servicios: List[ServicioUpdate], db: Session = Depends(get_db)
+    servicios: List[ServicioUpdate], db: AsyncSession = Depends(get_db)
 ):
     """
     Perform bulk update of many servicios.
@@ -94,8 +178,9 @@ async def bulk_update_servicios(
     try:
         updated_servicios = [servicio.model_dump() for servicio in servicios]
         stmt = update(dbServicio).returning(dbServicio)
-        servicios = db.scalars(stmt, updated_servicios)
-        db.commit()
+        servicios = await db.scalars(stmt, updated_servicios)
+        await db.commit()
+        await invalidate_catalog()
     except StaleDataError:
         raise HTTPException(status_code=404, detail="A servicio was not found")
     return {"message": "Bulk update successful"}
@@ -103,7 +188,7 @@ async def bulk_update_servicios(
 
 @router.delete("/{servicio_id}")
 async def delete_servicio(
-    servicio_id: int = Path(**servicio_id_metadata), db: Session = Depends(get_db)
+    servicio_id: UUID = Path(**servicio_id_metadata), db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific Servicio.
@@ -113,23 +198,11 @@ async def delete_servicio(
         .where(dbServicio.servicio_id == servicio_id)
         .returning(dbServicio.servicio_id)
     )
-    deleted_servicio = db.execute(transaction).first()
+    deleted_servicio = (await db.execute(transaction)).first()
     if deleted_servicio is None:
         raise HTTPException(
             status_code=404, detail=f"servicio id={servicio_id}was not found"
         )
-    db.commit()
+    await db.commit()
+    await invalidate_catalog()
     return {"message": f"Servicio id={deleted_servicio[0]} deleted successfully"}
-
-
-def paginate(pagination_parms: PagintationParams, data: list[Any]):
-    """Build Paginataded Response"""
-    response = PaginatedResponse(
-        total=len(data),
-        offset=pagination_parms.offset,
-        limit=pagination_parms.limit,
-        items=data,
-    )
-    if len(data) == pagination_parms.limit:
-        response.next_offset = pagination_parms.offset + pagination_parms.offset
-    return response
@@ -1,20 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends, Path
+from fastapi import APIRouter, HTTPException, Depends, Path, Request, Response
 from sqlalchemy import select, update, delete, insert
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.exc import StaleDataError
-from typing import List, Any, Annotated
+from typing import List, Annotated, Union
+from uuid import UUID
 
+from ..dependencies.bulk import UPSERT_CHUNK_SIZE, chunkSize, upsert_in_chunks
+from ..dependencies.catalog import cached_page, invalidate_catalog
+from ..dependencies.batch import fetch_batch, idsQuery
 from ..dependencies.common import errorResponses
-from ..dependencies import auth
-from ...models import Tag as dbTag
+from ..dependencies.serialization import json_response
+from ..dependencies.constants import CACHE_CONTROL_CATALOG
+from ..dependencies.etag import conditional_get
+from ..dependencies.fieldsets import Selection, tag_fields
+from ..dependencies import auth, filtering, loading, versions
+from ...models import Tag as dbTag, lazy_utc_now
 from ...database import get_db
+from ...schemas.batch import BatchResponse
+from ...schemas.bulk import UpsertReport
 from ...schemas.servicio import Tag, TagCreate, TagUpdate
+from ...schemas.filters import TagFilters
 from ...schemas.pagination import PagintationParams, PaginatedResponse
 
 
-router = APIRouter(responses=errorResponses, dependencies=[Depends(auth.get_user)])
+router = APIRouter(
+    responses=errorResponses, dependencies=[Depends(auth.scope_to_organizacion)]
+)
 pagintationParams = Annotated[PagintationParams, Depends()]
-SessionLocal = Annotated[Session, Depends(get_db)]
+tagFilters = Annotated[TagFilters, Depends()]
+tagFields = Annotated[Selection, Depends(tag_fields.selection)]
+SessionLocal = Annotated[AsyncSession, Depends(get_db)]
 tag_id_metadata = {
     "title": "Tag id",
     "description": "The unique identifier for the Tag.",
@@ -22,26 +38,46 @@ tag_id_metadata = {
 
 
 @router.get("/{tag_id}", response_model=Tag)
-async def get_tag(tag_id: int = Path(**tag_id_metadata), db: Session = Depends(get_db)):
+async def get_tag(
+    request: Request,
+    response: Response,
+    tag_id: UUID = Path(**tag_id_metadata),
+    db: AsyncSession = Depends(get_db),
+):
     """
     Retrieve information about a specific Tag.
     """
-    query = select(dbTag).where(dbTag.tag_id == tag_id)
-    tag = db.scalars(query).first()
+    await conditional_get(
+        db, request, response, versions.tag(tag_id), CACHE_CONTROL_CATALOG
+    )
+    query = select(dbTag).options(*loading.tag).where(dbTag.tag_id == tag_id)
+    tag = (await db.scalars(query)).first()
     if tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
-    return tag
+    return json_response(Tag, tag, response)
 
 
-@router.get("", response_model=PaginatedResponse[Tag])
-async def get_multiple_tags(params: pagintationParams, db: SessionLocal):
+@router.get("", response_model=Union[PaginatedResponse[Tag], BatchResponse[Tag]])
+async def get_multiple_tags(
+    params: pagintationParams,
+    filters: tagFilters,
+    selection: tagFields,
+    db: SessionLocal,
+    ids: idsQuery = None,
+):
     """
     Retrieve a multiple tags with pagination.
+    With `ids`, return those tags in request order instead of a page.
     """
-    query = select(dbTag).offset(params.offset).limit(params.limit)
-    tags = db.scalars(query).all()
-    response = paginate(params, tags)
-    return response
+    schema = tag_fields.response_schema(selection)
+    if ids is not None:
+        query = select(dbTag).options(*tag_fields.options(selection))
+        batch = await fetch_batch(db, query, dbTag.tag_id, ids)
+        return json_response(BatchResponse[schema], batch)
+    sort = filtering.sort_column(dbTag, filters)
+    query = select(dbTag).options(*tag_fields.options(selection, sort))
+    query = filtering.tag(query, filters)
+    return await cached_page(db, query, params, filters, dbTag.tag_id, schema)
 
 
 @router.post("")
@@ -51,20 +87,46 @@ async def bulk_create_tags(new_tags: List[TagCreate], db: SessionLocal):
     """
     new_tags = [t.model_dump() for t in new_tags]
     stmt = insert(dbTag).returning(dbTag)
-    tags = db.scalars(stmt, new_tags)
-    db.commit()
+    try:
+        tags = (await db.scalars(stmt, new_tags)).all()
+        await db.commit()
+        await invalidate_catalog()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409, detail="A Tag with that nombre already exists"
+        )
     return tags
 
 
+@router.post("/upsert", response_model=UpsertReport)
+async def upsert_tags(
+    new_tags: List[TagCreate],
+    db: SessionLocal,
+    chunk_size: chunkSize = UPSERT_CHUNK_SIZE,
+):
+    """
+    Create many tags, reusing existing tags with the same nombre, one
+    statement per chunk.
+    """
+    now = lazy_utc_now()
+    rows = [
+        {"nombre": t.nombre, "created_at": now, "updated_at": now} for t in new_tags
+    ]
+    report = await upsert_in_chunks(db, dbTag.__table__, "nombre", rows, chunk_size)
+    await invalidate_catalog()
+    return report
+
+
 @router.put("")
-async def bulk_update_tags(tags: List[TagUpdate], db: Session = Depends(get_db)):
+async def bulk_update_tags(tags: List[TagUpdate], db: AsyncSession = Depends(get_db)):
     """
     Update multiple Tags.
     """
     try:
         updated_tags = [tag.model_dump() for tag in tags]
-        db.execute(update(dbTag), updated_tags)
-        db.commit()
+        await db.execute(update(dbTag), updated_tags)
+        await db.commit()
+        await invalidate_catalog()
     except StaleDataError:
         raise HTTPException(status_code=404, detail="A Tag was not found")
     return {"message": "Bulk update successful"}
@@ -72,27 +134,15 @@ async def bulk_update_tags(tags: List[TagUpdate], db: Session = Depends(get_db))
 
 @router.delete("/{tag_id}")
 async def delete_tag(
-    tag_id: int = Path(**tag_id_metadata), db: Session = Depends(get_db)
+    tag_id: UUID = Path(**tag_id_metadata), db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a specific Tag.
     """
     stmt = delete(dbTag).where(dbTag.tag_id == tag_id).returning(dbTag.tag_id)
-    deleted_tag = db.scalars(stmt).first()
+    deleted_tag = (await db.scalars(stmt)).first()
     if deleted_tag is None:
         raise HTTPException(status_code=404, detail=f"Tag id={tag_id} not found")
-    db.commit()
+    await db.commit()
+    await invalidate_catalog()
     return {"message": f"Servicio id={deleted_tag} deleted successfully"}
-
-
-def paginate(pagination_parms: PagintationParams, data: list[Any]):
-    """Build Paginataded Response"""
-    response = PaginatedResponse(
-        total=len(data),
-        offset=pagination_parms.offset,
-        limit=pagination_parms.limit,
-        items=data,
-    )
-    if len(data) == pagination_parms.limit:
-        response.next_offset = pagination_parms.offset + pagination_parms.offset
-    return response
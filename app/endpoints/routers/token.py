@@ -3,7 +3,8 @@ from sqlalchemy import select
 
 from ..dependencies.database import sessionDep
 from ..dependencies.password import Argon2Hashser
-from ..dependencies.auth import create_token
+from ..dependencies.auth import create_token, cache_user, user_organizaciones
+from ...compression import uncompressed
 from ...schemas.security import BearerToken, AuthRequest
 from ...models import User
 
@@ -12,15 +13,17 @@ router = APIRouter()
 
 
 @router.post("", response_model=BearerToken)
+@uncompressed
 async def create_access_token(data: AuthRequest, db: sessionDep):
     """
     Create a new access token.
     """
     query = select(User).where(User.email == data.email)
-    user = db.scalars(query).first()
+    user = (await db.scalars(query)).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    valid = Argon2Hashser.verify(user.password, data.password)
+    valid = await Argon2Hashser.verify_async(user.password, data.password)
     if not valid:
         raise HTTPException(status_code=401, detail="The provided password is invalid.")
-    return create_token(user.usuario_id)
+    cache_user(user, await user_organizaciones(db, user.usuario_id))
+    return create_token(user.usuario_id, rol=user.rol)
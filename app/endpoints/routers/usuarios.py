@@ -27,11 +27,11 @@ async def create_usuario(new_user: UserCreate, db: sessionDep):
     """
     Create a new Usuario.
     """
-    hashed_password = Argon2Hashser.create_hash(new_user.password)
+    hashed_password = await Argon2Hashser.create_hash_async(new_user.password)
     user = dbUser(**new_user.model_dump(exclude="password"), password=hashed_password)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
@@ -40,7 +40,7 @@ async def get_me(current_user: userDep, db: sessionDep):
     """
     Get information for the current User.
     """
-    me = db.get(dbUser, current_user)
+    me = await db.get(dbUser, current_user)
     return me
 
 
@@ -55,7 +55,7 @@ async def get_my_organizaciones(db: sessionDep, current_user: userDep):
         .subquery()
     )
     query = select(dbOrganizacion).join(subquery)
-    organizaciones = db.scalars(query).fetchall()
+    organizaciones = (await db.scalars(query)).fetchall()
     return organizaciones
 
 
@@ -69,7 +69,7 @@ async def get_usuario(
     Get information about a specific Usuario.
     """
     query = select(dbUser).where(dbUser.user_id == user_id)
-    user = db.scalars(query).first()
+    user = (await db.scalars(query)).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -0,0 +1,150 @@
+import json
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import env_int
+from .metrics import request_metrics
+
+
+request_logger = logging.getLogger("app.requests")
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+SLOW_QUERY_THRESHOLD = env_int("SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+REDACTED = "?"
+
+
+class QueryStats:
+    """
+    SQL statements executed while serving one request.
+    """
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        path = route.path if route is not None else self.scope["path"]
+        return f"{self.scope['method']} {path}"
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} statements", '
+            f"total;dur={total * 1000:.2f}"
+        )
+
+
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def redact(parameters: Any) -> Any:
+    """
+    Keep the shape of statement parameters but drop their values.
+    """
+    if isinstance(parameters, dict):
+        return {key: REDACTED for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"executemany": len(parameters), "first": redact(parameters[0])}
+        return [REDACTED] * len(parameters)
+    return REDACTED
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_start_time"].pop()
+    stats = current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+    if elapsed >= SLOW_QUERY_THRESHOLD:
+        slow_query_logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "route": stats.route if stats is not None else None,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "statement": statement,
+                    "parameters": redact(parameters),
+                }
+            )
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attribute every statement run on `engine` to the request being served.
+    Pass `AsyncEngine.sync_engine` for async engines.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class InstrumentationMiddleware:
+    """
+    Collect per-request SQL statistics, report them in a Server-Timing header,
+    log one structured line per request and update the request metrics.
+
+    Statements run after the response headers are sent, e.g. while streaming a
+    body, are not in the header but are included in the log line.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(scope)
+        token = current_stats.set(stats)
+        start = perf_counter()
+        status_code = 500
+        request_metrics.in_flight += 1
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", stats.server_timing(perf_counter() - start)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = perf_counter() - start
+            current_stats.reset(token)
+            request_metrics.in_flight -= 1
+            route = scope.get("route")
+            request_metrics.route(
+                scope["method"], route.path if route is not None else "unmatched"
+            ).record(status_code, duration)
+            request_logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "route": stats.route,
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 2),
+                        "db_statements": stats.count,
+                        "db_time_ms": round(stats.duration * 1000, 2),
+                    }
+                )
+            )
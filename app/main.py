@@ -1,6 +1,9 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.models import Info, Contact, License
 
+from .compression import CompressionMiddleware
+from .instrumentation import InstrumentationMiddleware
 from .endpoints.routers import (
     clientes,
     organizaciones,
@@ -10,6 +13,8 @@ from .endpoints.routers import (
     servicios,
     tags,
     cuentas,
+    query,
+    internal,
 )
 
 
@@ -22,6 +27,8 @@ tag_descriptions = {
     "Cuentas": "Operations related to accounts.",
     "Authorization": "Operations related to authorization tokens.",
     "Usuarios": "Operations related to users.",
+    "Query": "Nested reads across related resources in one request.",
+    "Internal": "Operational statistics about the running service.",
 }
 
 tags_metadata = [{"name": n, "description": d} for n, d in tag_descriptions.items()]
@@ -46,8 +53,14 @@ app = FastAPI(
     license=info.license,
     openapi_tags=tags_metadata,
     security=security,
+    default_response_class=ORJSONResponse,
 )
 
+# The last middleware added runs outermost, so request timings include
+# compression.
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(token.router, prefix="/token", tags=["Authorization"])
 app.include_router(
     organizaciones.router, prefix="/organizaciones", tags=["Organizaciones"]
@@ -58,4 +71,5 @@ app.include_router(empresas.router, prefix="/empresas", tags=["Empresas"])
 app.include_router(servicios.router, prefix="/servicios", tags=["Servicios"])
 app.include_router(tags.router, prefix="/tags", tags=["Tags"])
 app.include_router(cuentas.router, prefix="/cuentas", tags=["Cuentas"])
-
+app.include_router(query.router, prefix="/query", tags=["Query"])
+app.include_router(internal.router, prefix="/internal", tags=["Internal"])
@@ -0,0 +1,186 @@
+from bisect import bisect_left
+from typing import Iterable
+
+
+# Seconds; suited to connection checkout waits and SQL statement timings.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observations are counted in the first bucket whose
+    upper bound is greater than or equal to the value, the last slot holds +Inf.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """
+        Return (upper bound, cumulative count) pairs, ending with +Inf.
+        """
+        pairs = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": [
+                {"le": format_bound(bound), "count": count}
+                for bound, count in self.cumulative()
+            ],
+        }
+
+
+def format_bound(bound: float) -> str:
+    """
+    Render a bucket bound the way Prometheus expects it in the `le` label.
+    """
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+# Seconds; request latencies are dominated by SQL and hashing, so the buckets
+# reach further than the defaults.
+LATENCY_BUCKETS = DEFAULT_BUCKETS + (30,)
+
+
+class RouteMetrics:
+    """
+    Series for one (method, route template) pair. Created once per route and
+    reused, so recording a request allocates nothing new after warm-up.
+    """
+
+    __slots__ = ("labels", "responses", "errors", "latency")
+
+    def __init__(self, method: str, route: str):
+        self.labels = f'method="{escape(method)}",route="{escape(route)}"'
+        self.responses: dict[int, int] = {}
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+    def record(self, status: int, duration: float) -> None:
+        self.responses[status] = self.responses.get(status, 0) + 1
+        if status >= 500:
+            self.errors += 1
+        self.latency.observe(duration)
+
+
+class RequestMetrics:
+    """
+    Process-wide request counters, latency histograms and in-flight gauge.
+    Requests that match no route share a single "unmatched" series so unknown
+    paths cannot blow up the number of series.
+    """
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        key = (method, route)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics(method, route)
+        return metrics
+
+
+request_metrics = RequestMetrics()
+
+
+def escape(value: str) -> str:
+    """
+    Escape a Prometheus label value.
+    """
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def histogram_lines(name: str, labels: str, histogram: Histogram) -> list[str]:
+    sep, series = (",", f"{{{labels}}}") if labels else ("", "")
+    lines = [
+        f'{name}_bucket{{{labels}{sep}le="{format_bound(bound)}"}} {count}'
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{series} {histogram.sum}")
+    lines.append(f"{name}_count{series} {histogram.count}")
+    return lines
+
+
+def exposition(requests: RequestMetrics, pool, caches: Iterable = ()) -> str:
+    """
+    Render request, connection pool and cache metrics in the Prometheus text
+    format.
+    """
+    routes = list(requests.routes.values())
+    lines = [
+        "# HELP http_requests_total Requests served, by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for route in routes:
+        for status, count in list(route.responses.items()):
+            lines.append(
+                f'http_requests_total{{{route.labels},status="{status}"}} {count}'
+            )
+    lines += [
+        "# HELP http_request_errors_total Requests answered with a 5xx status.",
+        "# TYPE http_request_errors_total counter",
+    ]
+    lines += [f"http_request_errors_total{{{r.labels}}} {r.errors}" for r in routes]
+    lines += [
+        "# HELP http_request_duration_seconds Time to serve a request.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for route in routes:
+        lines += histogram_lines(
+            "http_request_duration_seconds", route.labels, route.latency
+        )
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {requests.in_flight}",
+        "# HELP db_pool_connections Connections in the pool, by state.",
+        "# TYPE db_pool_connections gauge",
+        f'db_pool_connections{{state="checked_in"}} {pool.checkedin()}',
+        f'db_pool_connections{{state="checked_out"}} {pool.checkedout()}',
+        f'db_pool_connections{{state="overflow"}} {pool.overflow()}',
+        "# HELP db_pool_size Configured size of the pool.",
+        "# TYPE db_pool_size gauge",
+        f"db_pool_size {pool.size()}",
+    ]
+    if hasattr(pool, "wait_time"):
+        lines += [
+            "# HELP db_pool_timeouts_total Checkouts that timed out.",
+            "# TYPE db_pool_timeouts_total counter",
+            f"db_pool_timeouts_total {pool.timeouts}",
+            "# HELP db_pool_wait_seconds Time spent waiting for a connection.",
+            "# TYPE db_pool_wait_seconds histogram",
+        ]
+        lines += histogram_lines("db_pool_wait_seconds", "", pool.wait_time)
+    lines += [
+        "# HELP cache_requests_total Cache lookups, by cache and result.",
+        "# TYPE cache_requests_total counter",
+    ]
+    for cache in caches:
+        for result in ("hit", "miss"):
+            count = cache.hits if result == "hit" else cache.misses
+            lines.append(
+                f'cache_requests_total{{cache="{cache.name}",result="{result}"}} {count}'
+            )
+    lines += [
+        "# HELP cache_errors_total Cache backend failures, served as misses.",
+        "# TYPE cache_errors_total counter",
+    ]
+    lines += [f'cache_errors_total{{cache="{c.name}"}} {c.errors}' for c in caches]
+    return "\n".join(lines) + "\n"
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, text
+from sqlalchemy import DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import DeclarativeBase, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -19,8 +19,32 @@ def lazy_utc_now():
 random_uuid_generator = text("gen_random_uuid()")
 
 
-class Empresa(Base):
+class TenantScoped:
+    """
+    Rows owned by one organizacion. Sessions scoped with
+    app.tenancy.scope_session filter and stamp them automatically.
+    """
+
+    organizacion_id = mapped_column(
+        UUID, ForeignKey("organizaciones.organizacion_id"), nullable=True
+    )
+
+
+class Empresa(TenantScoped, Base):
     __tablename__ = "empresas"
+    __table_args__ = (
+        Index(
+            "ix_empresas_tenant_created_at_rnc", "organizacion_id", "created_at", "rnc"
+        ),
+        Index("ix_empresas_tenant_nombre_rnc", "organizacion_id", "nombre", "rnc"),
+        Index(
+            "ix_empresas_tenant_tipo_de_persona_created_at_rnc",
+            "organizacion_id",
+            "tipo_de_persona",
+            "created_at",
+            "rnc",
+        ),
+    )
 
     rnc: Mapped[str] = mapped_column(primary_key=True)
     nombre: Mapped[str]
@@ -36,8 +60,22 @@ class Empresa(Base):
     cuenta: Mapped["Cuenta"] = relationship(viewonly=True)
 
 
-class Cliente(Base):
+class Cliente(TenantScoped, Base):
     __tablename__ = "clientes"
+    __table_args__ = (
+        Index(
+            "ix_clientes_tenant_created_at_cliente_id",
+            "organizacion_id",
+            "created_at",
+            "cliente_id",
+        ),
+        Index(
+            "ix_clientes_tenant_nombre_cliente_id",
+            "organizacion_id",
+            "nombre",
+            "cliente_id",
+        ),
+    )
 
     cliente_id = mapped_column(
         UUID, primary_key=True, server_default=random_uuid_generator
@@ -57,6 +95,7 @@ class Cliente(Base):
 
 class ClienteEmpresa(Base):
     __tablename__ = "clientes_empresas"
+    __table_args__ = (Index("ix_clientes_empresas_rnc", "rnc"),)
 
     cliente_id = mapped_column(
         UUID,
@@ -67,8 +106,22 @@ class ClienteEmpresa(Base):
     created_at: Mapped[datetime] = mapped_column(default=lazy_utc_now)
 
 
-class Servicio(Base):
+class Servicio(TenantScoped, Base):
     __tablename__ = "servicios"
+    __table_args__ = (
+        Index(
+            "ix_servicios_tenant_created_at_servicio_id",
+            "organizacion_id",
+            "created_at",
+            "servicio_id",
+        ),
+        Index(
+            "ix_servicios_tenant_nombre_servicio_id",
+            "organizacion_id",
+            "nombre",
+            "servicio_id",
+        ),
+    )
 
     servicio_id = mapped_column(
         UUID, primary_key=True, server_default=random_uuid_generator
@@ -84,6 +137,11 @@ class Servicio(Base):
 
 class Tag(Base):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index("ix_tags_created_at_tag_id", "created_at", "tag_id"),
+        Index("uq_tags_nombre", "nombre", unique=True),
+        Index("ix_tags_nombre_tag_id", "nombre", "tag_id"),
+    )
 
     tag_id = mapped_column(UUID, primary_key=True, server_default=random_uuid_generator)
     nombre: Mapped[str]
@@ -98,6 +156,7 @@ class Tag(Base):
 
 class TagServicio(Base):
     __tablename__ = "tags_servicios"
+    __table_args__ = (Index("ix_tags_servicios_servicio_id", "servicio_id"),)
 
     tag_id = mapped_column(ForeignKey("tags.tag_id"), primary_key=True)
     servicio_id = mapped_column(
@@ -106,8 +165,17 @@ class TagServicio(Base):
     created_at: Mapped[datetime] = mapped_column(default=lazy_utc_now)
 
 
-class Cuenta(Base):
+class Cuenta(TenantScoped, Base):
     __tablename__ = "cuentas"
+    __table_args__ = (
+        Index(
+            "ix_cuentas_tenant_created_at_cuenta_id",
+            "organizacion_id",
+            "created_at",
+            "cuenta_id",
+        ),
+        Index("ix_cuentas_tenant_rnc_cuenta_id", "organizacion_id", "rnc", "cuenta_id"),
+    )
 
     cuenta_id = mapped_column(
         UUID, primary_key=True, server_default=random_uuid_generator
@@ -126,6 +194,7 @@ class Cuenta(Base):
 
 class CuentaServicio(Base):
     __tablename__ = "cuentas_servicios"
+    __table_args__ = (Index("ix_cuentas_servicios_servicio_id", "servicio_id"),)
     cuenta_id = mapped_column(
         ForeignKey("cuentas.cuenta_id", ondelete="CASCADE"), primary_key=True
     )
@@ -133,6 +202,44 @@ class CuentaServicio(Base):
     created_at: Mapped[datetime] = mapped_column(default=lazy_utc_now)
 
 
+class CuentaResumen(TenantScoped, Base):
+    """
+    Per-cuenta counts for dashboards. A materialized view on PostgreSQL,
+    created by migration and refreshed by app.endpoints.dependencies.summary;
+    `info["is_view"]` keeps it out of autogenerated migrations.
+    """
+
+    __tablename__ = "cuentas_resumen"
+    __table_args__ = (
+        Index(
+            "ix_cuentas_resumen_tenant_created_at_cuenta_id",
+            "organizacion_id",
+            "created_at",
+            "cuenta_id",
+        ),
+        {"info": {"is_view": True}},
+    )
+
+    cuenta_id = mapped_column(UUID, primary_key=True)
+    rnc: Mapped[str]
+    created_at: Mapped[datetime]
+    servicios: Mapped[int]
+    clientes: Mapped[int]
+    tags: Mapped[int]
+
+
+class SummaryRefresh(Base):
+    """
+    When each materialized summary was last refreshed. Kept out of the views
+    themselves so a concurrent refresh only rewrites rows whose counts changed.
+    """
+
+    __tablename__ = "summary_refreshes"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    refreshed_at = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class User(Base):
     __tablename__ = "usuarios"
 
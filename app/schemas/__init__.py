@@ -0,0 +1,7 @@
+from .cliente_empresa import EmpresaDetail, EmpresaInDB
+from .cuenta import Cuenta, CuentaDetail
+
+# cuenta.py cannot import the empresa schemas at runtime without an import
+# cycle, so the forward references are resolved once both modules are loaded.
+Cuenta.model_rebuild(_types_namespace={"EmpresaInDB": EmpresaInDB})
+CuentaDetail.model_rebuild(_types_namespace={"EmpresaDetail": EmpresaDetail})
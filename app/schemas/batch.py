@@ -0,0 +1,13 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    # One entry per requested id, in request order; null where none was found.
+    items: list[Optional[T]]
+    # Requested ids that were not found, in request order.
+    missing: list[str]
@@ -0,0 +1,31 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class RowError(BaseModel):
+    row: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    received: int
+    imported: int
+    failed: int
+    # Only the first MAX_REPORTED_ERRORS failures are listed.
+    errors: list[RowError]
+
+
+class ChunkError(BaseModel):
+    rows: list[int]
+    detail: str
+
+
+class UpsertReport(BaseModel):
+    received: int
+    upserted: int
+    failed: int
+    # Id of each input row, in request order; null for rows that failed.
+    ids: list[Optional[UUID]]
+    errors: list[ChunkError]
@@ -1,5 +1,6 @@
 from typing import Optional
 from enum import Enum
+from uuid import UUID
 
 from pydantic import BaseModel, field_serializer, ConfigDict
 
@@ -22,13 +23,18 @@ class ClienteCreate(ClienteBase):
     email: str
 
 
+class ClienteImport(ClienteCreate):
+    # Rows with an id update that client, rows without one create a new client.
+    cliente_id: Optional[UUID] = None
+
+
 class ClienteUpdate(ClienteBase):
     telefono: Optional[str] = None
     email: Optional[str] = None
 
 
 class ClienteInDB(ClienteCreate, CommonDateFields):
-    cliente_id: int
+    cliente_id: UUID
 
 
 class EmpresaBase(BaseModel):
@@ -43,7 +49,7 @@ class EmpresaCreate(EmpresaBase):
     rnc: str
     nombre: str
     tipo_de_persona: PersonaEnum
-    relacionados: list[int] = []
+    relacionados: list[UUID] = []
 
 
 class EmpresaUpdate(EmpresaBase):
@@ -63,7 +69,17 @@ class Empresa(EmpresaInDB):
     cuenta: Optional[CuentaEmpresa] = None
 
 
+# Returned within the cuenta detail endpoint
+class EmpresaDetail(EmpresaInDB):
+    relacionados: list[ClienteInDB] = []
+
+
 # Returned by clientes endpoint
 class Cliente(ClienteBase, CommonDateFields):
-    cliente_id: int
+    cliente_id: UUID
     empresas: list[Empresa] = []
+
+
+# Returned by the cliente detail endpoint
+class ClienteDetail(ClienteInDB):
+    empresas: list[EmpresaInDB] = []
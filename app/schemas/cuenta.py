@@ -1,4 +1,6 @@
+from datetime import datetime
 from typing import List, TYPE_CHECKING
+from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
 
@@ -7,7 +9,7 @@ from .servicio import Servicio
 
 
 if TYPE_CHECKING:
-    from .cliente_empresa import EmpresaInDB
+    from .cliente_empresa import EmpresaDetail, EmpresaInDB
 
 
 class CuentaBase(BaseModel):
@@ -16,11 +18,11 @@ class CuentaBase(BaseModel):
 
 class CuentaNew(CuentaBase):
     rnc: str
-    servicios: list[int]
+    servicios: list[UUID]
 
 
 class CuentaInDB(CuentaBase):
-    cuenta_id: int
+    cuenta_id: UUID
     rnc: str
 
 
@@ -29,5 +31,18 @@ class Cuenta(CuentaInDB, CommonDateFields):
     empresa: "EmpresaInDB"
 
 
+# Returned by the cuenta detail endpoint
+class CuentaDetail(CuentaInDB, CommonDateFields):
+    empresa: "EmpresaDetail"
+
+
 class CuentaEmpresa(CuentaInDB):
     servicios: List["Servicio"]
+
+
+# Returned by the cuentas summary endpoint
+class CuentaSummary(CuentaInDB):
+    created_at: datetime
+    servicios: int
+    clientes: int
+    tags: int
@@ -0,0 +1,83 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from .cliente_empresa import PersonaEnum
+
+
+# Each sort enum is the whitelist of columns a list can be ordered by; its
+# values name model attributes, every one backed by a (column, key) index.
+class ClienteSort(Enum):
+    created_at = "created_at"
+    nombre = "nombre"
+
+
+class EmpresaSort(Enum):
+    created_at = "created_at"
+    nombre = "nombre"
+
+
+class ServicioSort(Enum):
+    created_at = "created_at"
+    nombre = "nombre"
+
+
+class TagSort(Enum):
+    created_at = "created_at"
+    nombre = "nombre"
+
+
+class CuentaSort(Enum):
+    created_at = "created_at"
+    rnc = "rnc"
+
+
+class SortOrder(Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class ListFilters(BaseModel):
+    created_after: Optional[datetime] = Field(
+        default=None, description="Only rows created at or after this time."
+    )
+    created_before: Optional[datetime] = Field(
+        default=None, description="Only rows created before this time."
+    )
+    order: SortOrder = SortOrder.asc
+
+
+class ClienteFilters(ListFilters):
+    sort: ClienteSort = ClienteSort.created_at
+    empresa: Optional[str] = Field(
+        default=None, description="Only clients related to the Empresa with this RNC."
+    )
+
+
+class EmpresaFilters(ListFilters):
+    sort: EmpresaSort = EmpresaSort.created_at
+    tipo_de_persona: Optional[PersonaEnum] = None
+
+
+class ServicioFilters(ListFilters):
+    sort: ServicioSort = ServicioSort.created_at
+    tag: Optional[UUID] = Field(
+        default=None, description="Only servicios with this tag."
+    )
+
+
+class TagFilters(ListFilters):
+    sort: TagSort = TagSort.created_at
+    servicio: Optional[UUID] = Field(
+        default=None, description="Only tags of this servicio."
+    )
+
+
+class CuentaFilters(ListFilters):
+    sort: CuentaSort = CuentaSort.created_at
+    servicio: Optional[UUID] = Field(
+        default=None, description="Only cuentas that include this servicio."
+    )
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class HistogramBucket(BaseModel):
+    le: str
+    count: int
+
+
+class HistogramSnapshot(BaseModel):
+    count: int
+    sum: float
+    buckets: list[HistogramBucket]
+
+
+class PoolStatus(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    timeouts: int
+    wait_time: Optional[HistogramSnapshot] = None
+
+
+class HashingStatus(BaseModel):
+    workers: int
+    max_pending: int
+    in_flight: int
+    queued: int
+    rejected: int
+    latency: HistogramSnapshot
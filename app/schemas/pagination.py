@@ -1,3 +1,7 @@
+import base64
+import json
+from datetime import datetime
+from enum import Enum
 from typing import Generic
 from typing import TypeVar
 from pydantic import BaseModel
@@ -8,14 +12,54 @@ from typing import Optional
 T = TypeVar("T")
 
 
+class CountMode(Enum):
+    exact = "exact"
+    estimated = "estimated"
+
+
 class PagintationParams(BaseModel):
     limit: int = Field(ge=0, le=50, default=20)
     offset: int = Field(ge=0, default=0)
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque `next_cursor` from a previous page. Takes precedence over offset.",
+    )
+    count: CountMode = Field(
+        default=CountMode.exact,
+        description="`estimated` reads the planner's row estimate instead of counting, for very large tables.",
+    )
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     total: int
+    total_is_estimate: bool = False
     limit: int
     offset: int
     next_offset: Optional[int] = None
+    next_cursor: Optional[str] = None
     items: list[T]
+
+
+def encode_cursor(value, key) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([str(value), str(key)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: type = datetime) -> tuple:
+    """
+    Decode a cursor produced by `encode_cursor`, converting its sort value to
+    `value_type`. Raises ValueError if malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, key = json.loads(base64.urlsafe_b64decode(padded))
+        if value_type is datetime:
+            return datetime.fromisoformat(value), key
+        return value_type(value), key
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
@@ -0,0 +1,27 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class QueryResource(str, Enum):
+    clientes = "clientes"
+    empresas = "empresas"
+    cuentas = "cuentas"
+    servicios = "servicios"
+    tags = "tags"
+
+
+class QueryNode(BaseModel):
+    # Columns to return; all of them when omitted.
+    fields: Optional[list[str]] = None
+    # Relationships to include, each with its own selection; none when omitted.
+    expand: dict[str, "QueryNode"] = {}
+
+
+class GraphQuery(QueryNode):
+    resource: QueryResource
+    # Keys of the records to read, in the order to return them. Without ids,
+    # the first `limit` records by key.
+    ids: Optional[list[str]] = None
+    limit: int = Field(50, ge=1, le=100)
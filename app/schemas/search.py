@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class SearchResults(BaseModel, Generic[T]):
+    query: str
+    # Best match first.
+    items: list[T]
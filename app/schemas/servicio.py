@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
+from uuid import UUID
 from .common import CommonDateFields
 
 
@@ -9,12 +10,12 @@ class ServicioBase(BaseModel):
 
 
 class ServicioCreate(ServicioBase):
-    tags: list[int] = []
+    tags: list[UUID] = []
 
 
 # Properties shared by models stored in DB
 class ServicioInDB(ServicioBase):
-    servicio_id: int
+    servicio_id: UUID
     nombre: str
 
 
@@ -22,6 +23,11 @@ class ServicioUpdate(ServicioInDB):
     pass
 
 
+class ServicioUpsert(ServicioBase):
+    # Rows with an id update that servicio, rows without one create a new one.
+    servicio_id: Optional[UUID] = None
+
+
 class TagBase(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     nombre: Optional[str] = None
@@ -37,7 +43,7 @@ class TagUpdate(TagBase):
 
 # Properties shared by models stored in DB
 class TagInDB(TagBase):
-    tag_id: int
+    tag_id: UUID
     nombre: str
 
 
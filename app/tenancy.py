@@ -0,0 +1,82 @@
+"""
+Tenant scoping for database sessions.
+
+A session scoped to an organizacion with `scope_session` only reads and writes
+that organizacion's rows:
+
+- every ORM SELECT, UPDATE and DELETE it runs gets an
+  `organizacion_id = ...` criterion for each TenantScoped entity, including
+  relationship loads and subqueries;
+- new TenantScoped objects are assigned the organizacion on flush;
+- Core inserts built from row dicts are stamped with `stamp_rows`.
+
+Unscoped sessions (migrations, scripts, the auth lookups) see every row.
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import Table, event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from .models import TenantScoped
+
+
+TENANT_KEY = "organizacion_id"
+
+
+def scope_session(session, organizacion_id: UUID) -> None:
+    """
+    Restrict `session`, sync or async, to one organizacion's rows.
+    """
+    session.info[TENANT_KEY] = organizacion_id
+
+
+def current_tenant(session) -> Optional[UUID]:
+    return session.info.get(TENANT_KEY)
+
+
+def is_scoped(session, model: type) -> bool:
+    """
+    Whether queries on `model` through `session` are filtered by tenant.
+    """
+    return current_tenant(session) is not None and issubclass(model, TenantScoped)
+
+
+def stamp_rows(session, target: Table, rows: list[dict]) -> None:
+    """
+    Assign the session's organizacion to rows about to be inserted into `target`.
+    """
+    organizacion_id = current_tenant(session)
+    if organizacion_id is None or TENANT_KEY not in target.c:
+        return
+    for row in rows:
+        row[TENANT_KEY] = organizacion_id
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filter_by_tenant(state: ORMExecuteState):
+    organizacion_id = state.session.info.get(TENANT_KEY)
+    if organizacion_id is None:
+        return
+    # Relationship and deferred column loads inherit the criteria from the
+    # statement that loaded their parents.
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            with_loader_criteria(
+                TenantScoped,
+                lambda cls: cls.organizacion_id == organizacion_id,
+                include_aliases=True,
+            )
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_tenant(session: Session, flush_context, instances):
+    organizacion_id = session.info.get(TENANT_KEY)
+    if organizacion_id is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, TenantScoped) and obj.organizacion_id is None:
+            obj.organizacion_id = organizacion_id
@@ -0,0 +1,83 @@
+"""
+Concurrent-request throughput benchmark.
+
+Fires a fixed number of authenticated GET requests at a running instance of the
+API while keeping `--concurrency` requests in flight, then reports throughput
+and latency percentiles. Run it against a build that uses the synchronous
+Session and against the async one, on the same database and a single uvicorn
+worker, to compare them:
+
+    uvicorn app.main:app --port 5000 --workers 1
+    python benchmarks/concurrency.py --email me@example.com --password secret \
+        --path /empresas --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--path", default="/empresas")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+async def get_token(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/token", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=60
+    ) as client:
+        token = await get_token(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: list[float] = []
+        errors = 0
+
+        async def one_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(args.path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests:    {args.requests} ({errors} errors)")
+    print(f"concurrency: {args.concurrency}")
+    print(f"elapsed:     {elapsed:.2f}s")
+    print(f"throughput:  {args.requests / elapsed:.1f} req/s")
+    print(f"latency p50: {percentile(latencies, 50) * 1000:.1f}ms")
+    print(f"latency p95: {percentile(latencies, 95) * 1000:.1f}ms")
+    print(f"latency p99: {percentile(latencies, 99) * 1000:.1f}ms")
+    print(f"latency avg: {statistics.fmean(latencies) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,237 @@
+"""
+Mixed-workload load test.
+
+Drives a running instance with a weighted mix of login, list, detail and bulk
+requests while keeping `--concurrency` requests in flight, then reports per
+scenario latency percentiles, throughput and the SQL statements each request
+ran (read from the Server-Timing header). Seed the database first with
+benchmarks/seed.py so volumes are realistic and comparable between runs:
+
+    python -m benchmarks.seed --truncate
+    uvicorn app.main:app --port 5000 --workers 1
+    python benchmarks/load.py --email bench@example.com --password benchmark \
+        --requests 5000 --concurrency 50 --output after.json --baseline before.json
+
+With `--baseline`, scenarios whose p95 latency or statement count grew by more
+than `--max-regression` percent are listed and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from concurrency import get_token, percentile
+
+
+STATEMENTS = re.compile(r'db;dur=([\d.]+);desc="(\d+) statements"')
+LIST_PATHS = ("/empresas", "/clientes", "/cuentas", "/servicios", "/tags")
+ID_FIELDS = {
+    "/empresas": "rnc",
+    "/clientes": "cliente_id",
+    "/cuentas": "cuenta_id",
+    "/servicios": "servicio_id",
+    "/tags": "tag_id",
+}
+DEFAULT_WEIGHTS = "list=40,detail=45,bulk=5,login=2,export=0"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--weights",
+        default=DEFAULT_WEIGHTS,
+        help=f"Relative share of each scenario (default {DEFAULT_WEIGHTS}).",
+    )
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON.")
+    parser.add_argument("--baseline", help="Compare against a previous --output.")
+    parser.add_argument("--max-regression", type=float, default=10.0)
+    return parser.parse_args()
+
+
+@dataclass
+class Samples:
+    latencies: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    db_time: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, response: httpx.Response, latency: float) -> None:
+        self.latencies.append(latency)
+        if response.status_code >= 400:
+            self.errors += 1
+        match = STATEMENTS.search(response.headers.get("server-timing", ""))
+        if match:
+            self.db_time.append(float(match.group(1)) / 1000)
+            self.statements.append(int(match.group(2)))
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": len(latencies) / elapsed,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "statements_avg": statistics.fmean(self.statements or [0]),
+            "statements_max": max(self.statements or [0]),
+            "db_time_avg": statistics.fmean(self.db_time or [0]),
+        }
+
+
+class Workload:
+    """
+    The scenarios, sharing ids sampled from the list endpoints.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.headers: dict[str, str] = {}
+        self.ids: dict[str, list[str]] = {}
+
+    async def setup(self) -> None:
+        token = await get_token(self.client, self.args.email, self.args.password)
+        self.headers = {"Authorization": f"Bearer {token}"}
+        for path in LIST_PATHS:
+            response = await self.client.get(
+                path, params={"limit": 50}, headers=self.headers
+            )
+            response.raise_for_status()
+            self.ids[path] = [str(i[ID_FIELDS[path]]) for i in response.json()["items"]]
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post(
+            "/token", json={"email": self.args.email, "password": self.args.password}
+        )
+
+    async def list(self) -> httpx.Response:
+        path = self.rng.choice(LIST_PATHS)
+        offset = self.rng.randrange(0, 20) * self.args.page_size
+        params = {"limit": self.args.page_size, "offset": offset}
+        return await self.client.get(path, params=params, headers=self.headers)
+
+    async def detail(self) -> httpx.Response:
+        path = self.rng.choice([p for p in LIST_PATHS if self.ids[p]])
+        item = self.rng.choice(self.ids[path])
+        return await self.client.get(f"{path}/{item}", headers=self.headers)
+
+    async def bulk(self) -> httpx.Response:
+        run = uuid.uuid4().hex[:8]
+        rows = [{"nombre": f"load-{run}-{i}"} for i in range(self.args.bulk_size)]
+        return await self.client.post("/tags/upsert", json=rows, headers=self.headers)
+
+    async def export(self) -> httpx.Response:
+        return await self.client.get("/empresas/export", headers=self.headers)
+
+
+def parse_weights(value: str) -> dict[str, float]:
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    weights = parse_weights(args.weights)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=120
+    ) as client:
+        workload = Workload(client, args)
+        await workload.setup()
+        names = list(weights)
+        plan = workload.rng.choices(names, [weights[n] for n in names], k=args.requests)
+        samples: dict[str, Samples] = defaultdict(Samples)
+        queue = iter(plan)
+
+        async def worker():
+            for name in queue:
+                start = time.perf_counter()
+                response = await getattr(workload, name)()
+                samples[name].record(response, time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    results = {name: samples[name].summary(elapsed) for name in names}
+    total = Samples()
+    for s in samples.values():
+        total.latencies += s.latencies
+        total.statements += s.statements
+        total.db_time += s.db_time
+        total.errors += s.errors
+    results["all"] = total.summary(elapsed)
+    return {"concurrency": args.concurrency, "elapsed": elapsed, "scenarios": results}
+
+
+def report(results: dict) -> None:
+    print(f"concurrency {results['concurrency']}, elapsed {results['elapsed']:.2f}s")
+    print(
+        f"{'scenario':<9} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'p99 ms':>8} {'sql avg':>8} {'sql max':>8} {'db ms':>7}"
+    )
+    for name, s in results["scenarios"].items():
+        print(
+            f"{name:<9} {s['requests']:>6} {s['errors']:>5} {s['throughput']:>8.1f} "
+            f"{s['p50'] * 1000:>8.1f} {s['p95'] * 1000:>8.1f} {s['p99'] * 1000:>8.1f} "
+            f"{s['statements_avg']:>8.1f} {s['statements_max']:>8} "
+            f"{s['db_time_avg'] * 1000:>7.1f}"
+        )
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    found = []
+    for name, current in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        for metric in ("p95", "statements_avg"):
+            if before[metric] and current[metric] > before[metric] * (
+                1 + threshold / 100
+            ):
+                change = (current[metric] / before[metric] - 1) * 100
+                found.append(f"{name} {metric}: +{change:.0f}%")
+    return found
+
+
+def main(args: argparse.Namespace) -> int:
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = asyncio.run(run(args))
+    report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline is None:
+        return 0
+    found = regressions(results, baseline, args.max_regression)
+    for line in found:
+        print(f"regression: {line}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,183 @@
+"""
+Seed a PostgreSQL database with realistic volumes for the load benchmarks.
+
+Uses the app's models and DB_* settings, so point it at a local database that
+has been migrated with `alembic upgrade head`. Rows are generated with a fixed
+seed, so two runs with the same arguments produce the same shape of data.
+Tenant rows are spread over `--organizaciones` organizaciones and the
+benchmark user belongs to the first one, so with more than one the load
+benchmark measures per-tenant queries on a shared table.
+`--truncate` empties the seeded tables first:
+
+    python -m benchmarks.seed --clientes 20000 --empresas 10000 --truncate
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+from app import models
+from app.database import engine
+from app.endpoints.dependencies.password import Argon2Hashser
+
+
+CHUNK_SIZE = 5000
+SEEDED_TABLES = (
+    "cuentas_servicios",
+    "tags_servicios",
+    "clientes_empresas",
+    "cuentas",
+    "empresas",
+    "clientes",
+    "servicios",
+    "tags",
+    "organizaciones_usuarios",
+    "organizaciones",
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clientes", type=int, default=20000)
+    parser.add_argument("--empresas", type=int, default=10000)
+    parser.add_argument("--servicios", type=int, default=300)
+    parser.add_argument("--tags", type=int, default=60)
+    parser.add_argument("--organizaciones", type=int, default=1)
+    parser.add_argument(
+        "--cuenta-ratio",
+        type=float,
+        default=0.8,
+        help="Share of empresas that have a cuenta.",
+    )
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--truncate", action="store_true")
+    return parser.parse_args()
+
+
+def timestamps(rng: random.Random) -> dict:
+    created = datetime.now(timezone.utc) - timedelta(minutes=rng.randrange(525600))
+    return {"created_at": created, "updated_at": created}
+
+
+async def insert_chunked(conn, model, rows: list[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await conn.execute(insert(model), rows[start : start + CHUNK_SIZE])
+    print(f"{model.__tablename__:<18} {len(rows):>8}")
+
+
+async def seed(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    uid = lambda: uuid.UUID(int=rng.getrandbits(128), version=4)  # noqa: E731
+
+    organizaciones = [
+        {
+            "organizacion_id": uid(),
+            "nombre": f"organizacion-{i}",
+            "created_at": timestamps(rng)["created_at"],
+        }
+        for i in range(args.organizaciones)
+    ]
+    organizacion_ids = [o["organizacion_id"] for o in organizaciones]
+    owner = lambda: rng.choice(organizacion_ids)  # noqa: E731
+
+    tags = [
+        {"tag_id": uid(), "nombre": f"tag-{i}", **timestamps(rng)}
+        for i in range(args.tags)
+    ]
+    servicios = [
+        {
+            "servicio_id": uid(),
+            "nombre": f"servicio-{i}",
+            "organizacion_id": owner(),
+            **timestamps(rng),
+        }
+        for i in range(args.servicios)
+    ]
+    tags_servicios = [
+        {"tag_id": tag["tag_id"], "servicio_id": s["servicio_id"], **timestamps(rng)}
+        for s in servicios
+        for tag in rng.sample(tags, k=min(len(tags), rng.randint(1, 3)))
+    ]
+    clientes = [
+        {
+            "cliente_id": uid(),
+            "nombre": f"cliente-{i}",
+            "email": f"cliente-{i}@example.com",
+            "telefono": f"809-{rng.randrange(10**7):07d}",
+            "organizacion_id": owner(),
+            **timestamps(rng),
+        }
+        for i in range(args.clientes)
+    ]
+    empresas = [
+        {
+            "rnc": f"{i:011d}",
+            "nombre": f"empresa-{i}",
+            "tipo_de_persona": rng.choice(["fisica", "juridica"]),
+            "organizacion_id": owner(),
+            **timestamps(rng),
+        }
+        for i in range(args.empresas)
+    ]
+    clientes_empresas = [
+        {"cliente_id": c["cliente_id"], "rnc": e["rnc"], **timestamps(rng)}
+        for e in empresas
+        for c in rng.sample(clientes, k=min(len(clientes), rng.randint(1, 3)))
+    ]
+    cuentas = [
+        {
+            "cuenta_id": uid(),
+            "rnc": e["rnc"],
+            "organizacion_id": e["organizacion_id"],
+            **timestamps(rng),
+        }
+        for e in empresas
+        if rng.random() < args.cuenta_ratio
+    ]
+    cuentas_servicios = [
+        {
+            "cuenta_id": c["cuenta_id"],
+            "servicio_id": s["servicio_id"],
+            **timestamps(rng),
+        }
+        for c in cuentas
+        for s in rng.sample(servicios, k=min(len(servicios), rng.randint(1, 5)))
+    ]
+
+    async with engine.begin() as conn:
+        if args.truncate:
+            await conn.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} CASCADE"))
+        await insert_chunked(conn, models.Organizacion, organizaciones)
+        await insert_chunked(conn, models.Tag, tags)
+        await insert_chunked(conn, models.Servicio, servicios)
+        await insert_chunked(conn, models.TagServicio, tags_servicios)
+        await insert_chunked(conn, models.Cliente, clientes)
+        await insert_chunked(conn, models.Empresa, empresas)
+        await insert_chunked(conn, models.ClienteEmpresa, clientes_empresas)
+        await insert_chunked(conn, models.Cuenta, cuentas)
+        await insert_chunked(conn, models.CuentaServicio, cuentas_servicios)
+        usuario_id = await conn.scalar(
+            insert(models.User).returning(models.User.usuario_id),
+            {
+                "nombre": "benchmark",
+                "email": args.email,
+                "password": Argon2Hashser.create_hash(args.password),
+                "rol": "superuser",
+            },
+        )
+        await conn.execute(
+            insert(models.OrganizacionUsuario),
+            {"organizacion_id": organizacion_ids[0], "usuario_id": usuario_id},
+        )
+        print(f"login: {args.email} / {args.password}")
+        await conn.execute(text("ANALYZE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(seed(parse_args()))
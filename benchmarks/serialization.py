@@ -0,0 +1,144 @@
+"""
+Response serialization micro-benchmark.
+
+Builds 50-item pages of Empresa and Cuenta graphs in memory, shaped like the
+list endpoints' responses, and measures the CPU time to turn one page into
+response bytes three ways:
+
+    fastapi   response_model validation + JSONResponse (the previous default)
+    orjson    response_model validation + ORJSONResponse (default class only)
+    direct    TypeAdapter validation + dump_json (json_response)
+
+No database or server is needed:
+
+    python -m benchmarks.serialization --items 50 --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+# app.database builds its engine at import time; it never connects here.
+for name, value in {
+    "DB_DRIVER": "postgresql+asyncpg",
+    "DB_USERNAME": "bench",
+    "DB_PASSWORD": "bench",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "bench",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app import models  # noqa: E402
+from app.endpoints.dependencies.serialization import dump_json  # noqa: E402
+from app.schemas.cliente_empresa import Empresa  # noqa: E402
+from app.schemas.cuenta import Cuenta  # noqa: E402
+from app.schemas.pagination import PaginatedResponse  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    return parser.parse_args()
+
+
+NOW = datetime.now(timezone.utc)
+stamps = {"created_at": NOW, "updated_at": NOW}
+
+
+def servicios(n: int) -> list[models.Servicio]:
+    tags = [
+        models.Tag(tag_id=uuid.uuid4(), nombre=f"tag-{i}", **stamps) for i in range(2)
+    ]
+    return [
+        models.Servicio(servicio_id=uuid.uuid4(), nombre=f"s-{i}", tags=tags, **stamps)
+        for i in range(n)
+    ]
+
+
+def empresa(i: int) -> models.Empresa:
+    rnc = f"{i:011d}"
+    empresa = models.Empresa(
+        rnc=rnc,
+        nombre=f"empresa-{i}",
+        tipo_de_persona="juridica",
+        relacionados={
+            models.Cliente(
+                cliente_id=uuid.uuid4(),
+                nombre=f"c-{j}",
+                email="e",
+                telefono="t",
+                **stamps,
+            )
+            for j in range(2)
+        },
+        **stamps,
+    )
+    empresa.cuenta = models.Cuenta(
+        cuenta_id=uuid.uuid4(), rnc=rnc, servicios=servicios(2), **stamps
+    )
+    return empresa
+
+
+def cuenta(i: int) -> models.Cuenta:
+    cuenta = empresa(i).cuenta
+    cuenta.empresa = models.Empresa(
+        rnc=cuenta.rnc, nombre=f"empresa-{i}", tipo_de_persona="fisica", **stamps
+    )
+    return cuenta
+
+
+def page(items: list) -> PaginatedResponse:
+    return PaginatedResponse(total=len(items), limit=len(items), offset=0, items=items)
+
+
+def per_call(func, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat
+
+
+def via_response_model(schema, content, response_class):
+    field = create_response_field(name="response", type_=schema)
+    loop = asyncio.new_event_loop()
+
+    def render():
+        value = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return response_class(value).body
+
+    return render
+
+
+def main(args: argparse.Namespace) -> None:
+    cases = {
+        "Empresa": (
+            PaginatedResponse[Empresa],
+            page([empresa(i) for i in range(args.items)]),
+        ),
+        "Cuenta": (
+            PaginatedResponse[Cuenta],
+            page([cuenta(i) for i in range(args.items)]),
+        ),
+    }
+    print(f"{'schema':<8} {'fastapi':>10} {'orjson':>10} {'direct':>10}  (ms/page)")
+    for name, (schema, content) in cases.items():
+        timings = [
+            per_call(via_response_model(schema, content, JSONResponse), args.repeat),
+            per_call(via_response_model(schema, content, ORJSONResponse), args.repeat),
+            per_call(lambda: dump_json(schema, content), args.repeat),
+        ]
+        print(f"{name:<8} " + " ".join(f"{t * 1000:>10.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,74 @@
+"""
+Batched upsert benchmark.
+
+Posts the same `--rows`-row payload to an upsert endpoint once per chunk size
+and reports elapsed time and rows per second. The first pass for each chunk
+size inserts fresh rows; `--repeat` re-sends the payload so later passes
+measure the ON CONFLICT update path:
+
+    uvicorn app.main:app --port 5000 --workers 1
+    python benchmarks/upsert.py --email me@example.com --password secret \
+        --path /tags/upsert --rows 10000 --chunk-sizes 100 500 1000 5000
+"""
+import argparse
+import time
+import uuid
+
+import httpx
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument(
+        "--path", default="/tags/upsert", choices=["/tags/upsert", "/servicios/upsert"]
+    )
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument(
+        "--chunk-sizes", type=int, nargs="+", default=[100, 500, 1000, 5000]
+    )
+    parser.add_argument("--repeat", type=int, default=2)
+    return parser.parse_args()
+
+
+def payload(path: str, rows: int) -> list[dict]:
+    run = uuid.uuid4().hex[:8]
+    if path == "/servicios/upsert":
+        return [
+            {"servicio_id": str(uuid.uuid4()), "nombre": f"bench-{run}-{i}"}
+            for i in range(rows)
+        ]
+    return [{"nombre": f"bench-{run}-{i}"} for i in range(rows)]
+
+
+def main(args: argparse.Namespace) -> None:
+    with httpx.Client(base_url=args.base_url, timeout=600) as client:
+        response = client.post(
+            "/token", json={"email": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        print(f"{'chunk':>6} {'pass':>4} {'elapsed':>9} {'rows/s':>9} {'failed':>6}")
+        for chunk_size in args.chunk_sizes:
+            rows = payload(args.path, args.rows)
+            for attempt in range(1, args.repeat + 1):
+                start = time.perf_counter()
+                response = client.post(
+                    args.path,
+                    params={"chunk_size": chunk_size},
+                    json=rows,
+                    headers=headers,
+                )
+                elapsed = time.perf_counter() - start
+                response.raise_for_status()
+                report = response.json()
+                print(
+                    f"{chunk_size:>6} {attempt:>4} {elapsed:>8.2f}s "
+                    f"{args.rows / elapsed:>9.0f} {report['failed']:>6}"
+                )
+
+
+if __name__ == "__main__":
+    main(parse_args())
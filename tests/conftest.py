@@ -1,34 +1,158 @@
+import asyncio
+import uuid
 import pytest
 from typing import Generator
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateColumn
 
 from app import models, main, database
+from app.instrumentation import instrument_engine
+from app.tenancy import scope_session
+from app.endpoints.dependencies import auth
+from app.endpoints.dependencies.catalog import catalog_cache
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# A request that needs more statements than this almost certainly lazy-loads
+# per row; tests that expect fewer can assert on `api_client.statements`.
+MAX_STATEMENTS_PER_REQUEST = 10
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
+TEST_USER_ID = uuid.UUID("00000000-0000-4000-8000-000000000001")
+TEST_ORGANIZACION_ID = uuid.UUID("00000000-0000-4000-8000-0000000000a1")
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# The models use PostgreSQL's UUID type and gen_random_uuid(); teach SQLite both.
+@compiles(UUID, "sqlite")
+def compile_uuid_for_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(CreateColumn, "sqlite")
+def compile_column_for_sqlite(element, compiler, **kw):
+    ddl = compiler.visit_create_column(element, **kw)
+    return ddl.replace("DEFAULT gen_random_uuid()", "DEFAULT (gen_random_uuid())")
+
+
+def register_sqlite_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function("gen_random_uuid", 0, lambda: uuid.uuid4().hex)
+
+
+class StatementCountingClient(TestClient):
+    """
+    Test client that records the SQL emitted while serving each request and
+    fails the test when a request exceeds `max_statements`.
+    """
+
+    max_statements = MAX_STATEMENTS_PER_REQUEST
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements: list[str] = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def request(self, *args, **kwargs):
+        self.statements = []
+        response = super().request(*args, **kwargs)
+        if len(self.statements) > self.max_statements:
+            pytest.fail(
+                f"request emitted {len(self.statements)} SQL statements "
+                f"(limit {self.max_statements}):\n" + "\n".join(self.statements)
+            )
+        return response
 
 
 @pytest.fixture(scope="session")
-def db() -> Generator:
+def database_path(tmp_path_factory) -> str:
+    # The app runs on an async engine while fixtures seed data through a sync
+    # session, so both engines share a file-backed SQLite database.
+    return str(tmp_path_factory.mktemp("db") / "test.sqlite")
+
+
+@pytest.fixture(scope="session")
+def db(database_path) -> Generator:
+    engine = create_engine(f"sqlite:///{database_path}")
+    event.listen(engine, "connect", register_sqlite_functions)
     models.Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     with TestingSessionLocal() as session:
+        # Seed and inspect rows as the organizacion the API client acts for.
+        scope_session(session, TEST_ORGANIZACION_ID)
         yield session
 
 
 @pytest.fixture(scope="module")
-def api_client(db) -> Generator:
+def api_client(db, database_path) -> Generator:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+    event.listen(engine.sync_engine, "connect", register_sqlite_functions)
+    instrument_engine(engine.sync_engine)
+    TestingAsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def get_test_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app = main.app
-    app.dependency_overrides[database.get_db] = lambda: db
-    with TestClient(app) as client:
+    app.dependency_overrides[database.get_db] = get_test_db
+    app.dependency_overrides[auth.get_user] = lambda: TEST_USER_ID
+    app.dependency_overrides[auth.get_organizacion] = lambda: TEST_ORGANIZACION_ID
+    with StatementCountingClient(app) as client:
+        event.listen(engine.sync_engine, "before_cursor_execute", client.record)
         yield client
+        event.remove(engine.sync_engine, "before_cursor_execute", client.record)
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_cache():
+    # Fixtures write through the sync session, which bypasses invalidation.
+    asyncio.run(catalog_cache.invalidate())
+
+
+@pytest.fixture(scope="module")
+def cuenta_graph(db) -> list[models.Empresa]:
+    """
+    Three empresas, each with two related clientes and a cuenta holding two
+    servicios tagged twice, i.e. every relationship the response schemas walk.
+    """
+    tags = [models.Tag(nombre=f"tag-{uuid.uuid4().hex}") for _ in range(2)]
+    db.add_all(tags)
+    db.flush()
+    empresas = []
+    for i in range(3):
+        servicios = [
+            models.Servicio(
+                nombre=f"servicio-{i}-{j}",
+                tag_servicios=[models.TagServicio(tag_id=t.tag_id) for t in tags],
+            )
+            for j in range(2)
+        ]
+        db.add_all(servicios)
+        db.flush()
+        rnc = uuid.uuid4().hex[:11]
+        empresa = models.Empresa(
+            rnc=rnc,
+            nombre=f"empresa-{i}",
+            tipo_de_persona="juridica",
+            relacionados={
+                models.Cliente(nombre=f"cliente-{i}-{j}", email="e", telefono="t")
+                for j in range(2)
+            },
+        )
+        cuenta = models.Cuenta(
+            rnc=rnc,
+            cuenta_servicios=[
+                models.CuentaServicio(servicio_id=s.servicio_id) for s in servicios
+            ],
+        )
+        db.add_all([empresa, cuenta])
+        empresas.append(empresa)
+    db.commit()
+    return empresas
@@ -1,3 +1,6 @@
+import json
+import uuid
+
 import pytest
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
@@ -58,8 +61,32 @@ class TestGet:
         response = api_client.get(path)
         assert response.status_code == 422
 
+    def test_detail_shape(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        cliente = next(iter(cuenta_graph[0].relacionados))
+        response = api_client.get(f"{self.endpoint}/{cliente.cliente_id}")
+        data = response.json()
+        assert response.status_code == 200
+        assert set(data) == {
+            "cliente_id",
+            "nombre",
+            "email",
+            "telefono",
+            "created_at",
+            "updated_at",
+            "empresas",
+        }
+        assert data["empresas"] == [
+            {
+                "rnc": cuenta_graph[0].rnc,
+                "nombre": cuenta_graph[0].nombre,
+                "tipo_de_persona": "juridica",
+            }
+        ]
+
     def test_not_found(self, api_client: TestClient):
-        cliente_id = 11111111111111
+        cliente_id = uuid.uuid4()
         path = f"{self.endpoint}/{cliente_id}"
         response = api_client.get(path)
         assert response.status_code == 404
@@ -85,3 +112,85 @@ class TestPost:
         one_mintue = timedelta(minutes=1)
         assert response.status_code == 200
         assert current_time - created_time < one_mintue
+
+
+class TestExport:
+    endpoint = "/clientes/export"
+
+    def test_ndjson(self, api_client: TestClient, db: Session):
+        total = db.query(models.Cliente).count()
+        response = api_client.get(self.endpoint)
+        lines = response.text.splitlines()
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(lines) == total
+        assert set(json.loads(lines[0])) == {
+            "cliente_id",
+            "nombre",
+            "email",
+            "telefono",
+            "created_at",
+            "updated_at",
+        }
+        assert len(api_client.statements) == 1
+
+
+class TestImport:
+    endpoint = "/clientes/import"
+
+    def test_ndjson(self, api_client: TestClient, db: Session):
+        existing = models.Cliente(nombre="Ana", email="ana@a.com", telefono="1")
+        db.add(existing)
+        db.commit()
+        body = "\n".join(
+            [
+                json.dumps({"nombre": "Nuevo", "email": "n@n.com", "telefono": "2"}),
+                json.dumps({"nombre": "Sin email", "telefono": "3"}),
+                "{not json",
+                json.dumps(
+                    {
+                        "cliente_id": str(existing.cliente_id),
+                        "nombre": "Ana Maria",
+                        "email": "ana@a.com",
+                        "telefono": "1",
+                    }
+                ),
+            ]
+        )
+        response = api_client.post(self.endpoint, content=body)
+        report = response.json()
+        assert response.status_code == 200
+        assert report["received"] == 4
+        assert report["imported"] == 2
+        assert [e["row"] for e in report["errors"]] == [2, 3]
+        assert "email" in report["errors"][0]["detail"]
+        db.refresh(existing)
+        assert existing.nombre == "Ana Maria"
+
+
+class TestBatchGet:
+    endpoint = "/clientes"
+
+    def test_request_order_and_missing(self, api_client: TestClient, db: Session):
+        clientes = [
+            models.Cliente(nombre=f"lote-{i}", email="l", telefono="t")
+            for i in range(3)
+        ]
+        db.add_all(clientes)
+        db.commit()
+        unknown = str(uuid.uuid4())
+        ids = [str(clientes[2].cliente_id), unknown, str(clientes[0].cliente_id)]
+        response = api_client.get(self.endpoint, params={"ids": ",".join(ids)})
+        data = response.json()
+        assert response.status_code == 200
+        assert [c and c["cliente_id"] for c in data["items"]] == [ids[0], None, ids[2]]
+        assert data["missing"] == [unknown]
+
+    def test_too_many_ids(self, api_client: TestClient):
+        ids = ",".join(str(uuid.uuid4()) for _ in range(501))
+        response = api_client.get(self.endpoint, params={"ids": ids})
+        assert response.status_code == 400
+
+    def test_invalid_id(self, api_client: TestClient):
+        response = api_client.get(self.endpoint, params={"ids": "not-a-uuid"})
+        assert response.status_code == 400
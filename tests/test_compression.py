@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import models
+from app.compression import (
+    CompressionMiddleware,
+    choose_encoding,
+    encoders,
+    uncompressed,
+    zstd,
+)
+
+
+BODY = "cuenta " * 400
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        lines = (f'{{"n": {n}}}\n' for n in range(100))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @app.get("/secret")
+    @uncompressed
+    def secret():
+        return PlainTextResponse(BODY)
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(make_app())
+
+
+def get(client: TestClient, path: str, encoding: str = "gzip"):
+    return client.get(path, headers={"Accept-Encoding": encoding})
+
+
+class TestNegotiation:
+    def test_preference(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("identity") is None
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("*") == next(iter(encoders))
+
+
+class TestMiddleware:
+    def test_large_body(self, client: TestClient):
+        response = get(client, "/large")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.text == BODY
+
+    def test_below_threshold(self, client: TestClient):
+        response = get(client, "/small")
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == "tiny"
+
+    def test_not_accepted(self, client: TestClient):
+        response = get(client, "/large", "identity")
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+
+    def test_streamed(self, client: TestClient):
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as r:
+            raw = b"".join(r.iter_raw())
+        assert r.headers["content-encoding"] == "gzip"
+        assert "content-length" not in r.headers
+        lines = gzip.decompress(raw).decode().splitlines()
+        assert [json.loads(line)["n"] for line in lines] == list(range(100))
+
+    def test_opt_out(self, client: TestClient):
+        response = get(client, "/secret")
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.skipif(zstd is None, reason="zstd module not installed")
+    def test_zstd(self, client: TestClient):
+        with client.stream("GET", "/large", headers={"Accept-Encoding": "zstd"}) as r:
+            raw = b"".join(r.iter_raw())
+        assert r.headers["content-encoding"] == "zstd"
+        assert zstd.decompress(raw).decode() == BODY
+
+
+class TestApp:
+    def test_cuenta_page(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        response = get(api_client, "/cuentas")
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["items"]) >= 3
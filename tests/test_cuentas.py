@@ -0,0 +1,164 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app import models
+from app.endpoints.dependencies import summary
+
+
+class TestGet:
+    endpoint = "/cuentas"
+
+    def test_queries_do_not_grow_with_page_size(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        api_client.get(self.endpoint, params={"limit": 1})
+        single_page = len(api_client.statements)
+        response = api_client.get(self.endpoint, params={"limit": 3})
+        data = response.json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 3
+        assert len(data["items"][0]["servicios"]) == 2
+        assert len(api_client.statements) == single_page
+
+
+class TestDetail:
+    def test_shape(self, api_client: TestClient, cuenta_graph: list[models.Empresa]):
+        empresa = cuenta_graph[0]
+        response = api_client.get(f"/cuentas/{empresa.cuenta.cuenta_id}")
+        data = response.json()
+        assert response.status_code == 200
+        assert set(data) == {"cuenta_id", "rnc", "created_at", "updated_at", "empresa"}
+        assert set(data["empresa"]) == {
+            "rnc",
+            "nombre",
+            "tipo_de_persona",
+            "relacionados",
+        }
+        assert {c["cliente_id"] for c in data["empresa"]["relacionados"]} == {
+            str(c.cliente_id) for c in empresa.relacionados
+        }
+        assert "organizacion_id" not in data["empresa"]["relacionados"][0]
+
+
+class TestFieldsets:
+    endpoint = "/cuentas"
+
+    def test_fields_only(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        api_client.get(self.endpoint, params={"limit": 3})
+        full = len(api_client.statements)
+        response = api_client.get(
+            self.endpoint, params={"limit": 3, "fields": "cuenta_id,rnc"}
+        )
+        items = response.json()["items"]
+        assert response.status_code == 200
+        assert all(set(item) == {"cuenta_id", "rnc"} for item in items)
+        # Only the count and the page itself; no relationship loads.
+        assert len(api_client.statements) == 2 < full
+        assert "cuentas.updated_at" not in api_client.statements[-1]
+
+    def test_expand(self, api_client: TestClient, cuenta_graph: list[models.Empresa]):
+        response = api_client.get(
+            self.endpoint, params={"limit": 3, "expand": "empresa"}
+        )
+        item = response.json()["items"][0]
+        assert "empresa" in item
+        assert "servicios" not in item
+        assert "created_at" in item
+
+    def test_unknown_field(self, api_client: TestClient):
+        response = api_client.get(self.endpoint, params={"fields": "cuenta_id,saldo"})
+        assert response.status_code == 400
+        assert "saldo" in response.json()["detail"]
+
+
+class TestSummary:
+    endpoint = "/cuentas/summary"
+
+    @pytest.fixture(autouse=True)
+    def primary(self, database_path, monkeypatch):
+        # Refreshes run on sessions of their own, normally on the primary.
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+        )
+        sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+        monkeypatch.setattr(summary, "SessionLocal", sessions)
+
+    def items(self, api_client: TestClient) -> dict:
+        response = api_client.get(self.endpoint, params={"limit": 50})
+        assert response.status_code == 200
+        return {item["rnc"]: item for item in response.json()["items"]}
+
+    def test_counts(self, api_client: TestClient, cuenta_graph: list[models.Empresa]):
+        # The first read finds the summary empty and refreshes it afterwards.
+        self.items(api_client)
+        rows = self.items(api_client)
+        for empresa in cuenta_graph:
+            row = rows[empresa.rnc]
+            assert (row["servicios"], row["clientes"], row["tags"]) == (2, 2, 2)
+
+    def test_refreshed_after_the_read_once_stale(
+        self,
+        api_client: TestClient,
+        db: Session,
+        cuenta_graph: list[models.Empresa],
+        monkeypatch,
+    ):
+        self.items(api_client)
+        empresa = cuenta_graph[0]
+        empresa.relacionados.add(
+            models.Cliente(nombre="nuevo", email="e", telefono="t")
+        )
+        db.commit()
+
+        assert self.items(api_client)[empresa.rnc]["clientes"] == 2
+        # The freshness check, the count and the page; reads never write.
+        assert len(api_client.statements) == 3
+        monkeypatch.setattr(summary, "MAX_AGE", timedelta(0))
+        assert self.items(api_client)[empresa.rnc]["clientes"] == 2
+        assert all(s.startswith("SELECT") for s in api_client.statements)
+        assert self.items(api_client)[empresa.rnc]["clientes"] == 3
+        assert "Last-Modified" in api_client.get(self.endpoint).headers
+
+
+class TestCreate:
+    endpoint = "/cuentas"
+
+    def empresa(self, db: Session) -> str:
+        rnc = uuid.uuid4().hex[:11]
+        db.add(models.Empresa(rnc=rnc, nombre=rnc, tipo_de_persona="fisica"))
+        db.commit()
+        return rnc
+
+    def test_servicio_deleted_elsewhere_is_not_found(
+        self, api_client: TestClient, db: Session
+    ):
+        servicio = models.Servicio(nombre="efimero")
+        db.add(servicio)
+        db.commit()
+        servicios = [str(servicio.servicio_id)]
+        response = api_client.post(
+            self.endpoint, json={"rnc": self.empresa(db), "servicios": servicios}
+        )
+        assert response.status_code == 200
+        # Deleted without invalidating this worker's cache, as another worker would.
+        db.execute(
+            delete(models.CuentaServicio).where(
+                models.CuentaServicio.servicio_id == servicio.servicio_id
+            )
+        )
+        db.delete(servicio)
+        db.commit()
+        response = api_client.post(
+            self.endpoint, json={"rnc": self.empresa(db), "servicios": servicios}
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Some services were not found"
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Callable, Optional
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app import database
+from app.database import ReplicaSet, pool_options_from_env
+from app.metrics import Histogram
+
+
+class TestPoolOptions:
+    def test_defaults(self, monkeypatch):
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_PRE_PING"):
+            monkeypatch.delenv(name, raising=False)
+        options = pool_options_from_env()
+        assert options["pool_size"] == 5
+        assert options["max_overflow"] == 10
+        assert options["pool_pre_ping"] is True
+
+    def test_from_environment(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "40")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+        options = pool_options_from_env()
+        assert options["pool_size"] == 40
+        assert options["pool_recycle"] == 1800
+        assert options["pool_pre_ping"] is False
+
+
+class TestHistogram:
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        assert histogram.count == 4
+        assert histogram.cumulative() == [(0.1, 2), (1, 3), (float("inf"), 4)]
+
+
+class TestReplicaSet:
+    def test_round_robin(self):
+        replicas = ReplicaSet(["a", "b", "c"], retry_after=30)
+        assert [replicas.candidates()[0] for _ in range(4)] == ["a", "b", "c", "a"]
+
+    def test_skips_replicas_marked_down(self):
+        replicas = ReplicaSet(["a", "b"], retry_after=30)
+        replicas.mark_down("a")
+        assert replicas.candidates() == ["b"]
+        assert replicas.candidates() == ["b"]
+
+
+class TestGetDb:
+    def session_bind(
+        self,
+        method: str,
+        cookies: str = "",
+        response: Optional[Response] = None,
+        endpoint: Optional[Callable] = None,
+    ) -> AsyncEngine:
+        scope = {"type": "http", "method": method, "headers": [], "endpoint": endpoint}
+        if cookies:
+            scope["headers"].append((b"cookie", cookies.encode()))
+        if response is None:
+            response = Response()
+
+        async def bind():
+            sessions = database.get_db(Request(scope), response)
+            db = await anext(sessions)
+            await sessions.aclose()
+            return db.bind
+
+        return asyncio.run(bind())
+
+    @pytest.fixture
+    def replica(self, monkeypatch, tmp_path) -> AsyncEngine:
+        healthy = create_async_engine("sqlite+aiosqlite://")
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/db")
+        replicas = ReplicaSet([broken, healthy], retry_after=30)
+        monkeypatch.setattr(database, "replicas", replicas)
+        return healthy
+
+    def test_reads_use_healthy_replica(self, replica):
+        assert self.session_bind("GET") is replica
+
+    def test_writes_and_pinned_reads_use_primary(self, replica):
+        assert self.session_bind("POST") is database.engine
+        assert self.session_bind("GET", "db_primary=1") is database.engine
+
+    def test_read_only_routes_use_replica_without_pinning(self, replica):
+        response = Response()
+        endpoint = database.read_only(lambda: None)
+        assert (
+            self.session_bind("POST", response=response, endpoint=endpoint) is replica
+        )
+        assert "set-cookie" not in response.headers
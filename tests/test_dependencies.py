@@ -1,5 +1,20 @@
-from app.endpoints.dependencies.password import Argon2Hashser
+import asyncio
+import json
+from types import SimpleNamespace
+
+import asyncpg
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.endpoints.dependencies.bulk import import_records
+from app.endpoints.dependencies.common import foreign_key_violation
+from app.endpoints.dependencies.password import Argon2Hashser, HashingPool
 from app.endpoints.dependencies.auth import create_token, decode_token
+from app.cache import LocalBackend, NamespacedCache, RedisBackend, TTLCache
+from app.endpoints.routers.clientes import cliente_row
+from app.models import Cliente
+from app.schemas.export import ExportFormat
 
 
 class TestPasswordHasher:
@@ -31,3 +46,188 @@ class TestToken:
         token = create_token(sub, exp_time_delta=15)
         parsed_token = decode_token(token.access_token)
         assert sub == parsed_token.get("sub")
+
+    def test_role_claim(self):
+        token = create_token("asafasfasasf", rol="superuser")
+        parsed_token = decode_token(token.access_token)
+        assert parsed_token.get("rol") == "superuser"
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = TTLCache(ttl=10, timer=lambda: now[0])
+        cache.set("sub", "user")
+        assert cache.get("sub") == "user"
+        now[0] = 10.0
+        assert cache.get("sub") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestHashingPool:
+    def test_hash_off_the_event_loop(self):
+        password = "coconutLemonade"
+        hashed_password = asyncio.run(Argon2Hashser.create_hash_async(password))
+        assert asyncio.run(Argon2Hashser.verify_async(hashed_password, password))
+
+    def test_rejects_when_full(self):
+        pool = HashingPool(max_workers=1, max_pending=0)
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(pool.run(Argon2Hashser.create_hash, "password"))
+        assert error.value.status_code == 503
+        assert pool.rejected == 1
+
+
+class TestForeignKeyViolation:
+    def error(self, orig) -> IntegrityError:
+        return IntegrityError("INSERT ...", {}, orig)
+
+    def test_postgres_sqlstate(self):
+        assert foreign_key_violation(self.error(SimpleNamespace(sqlstate="23503")))
+        assert not foreign_key_violation(self.error(SimpleNamespace(sqlstate="23505")))
+
+    def test_sqlite_message(self):
+        assert foreign_key_violation(
+            self.error(Exception("FOREIGN KEY constraint failed"))
+        )
+        assert not foreign_key_violation(
+            self.error(Exception("UNIQUE constraint failed: cuentas.rnc"))
+        )
+
+
+class FakeRedis:
+    """
+    Local stand-in for the subset of the asyncio redis client RedisBackend uses.
+    """
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.expiry: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+
+class BrokenBackend:
+    async def get(self, key):
+        raise ConnectionError("cache unavailable")
+
+    set = incr = get
+
+
+class TestNamespacedCache:
+    @pytest.mark.parametrize(
+        "backend", [LocalBackend(), RedisBackend(FakeRedis(), ttl=30)]
+    )
+    def test_invalidate(self, backend):
+        cache = NamespacedCache("test", backend)
+
+        async def scenario():
+            assert await cache.get("page") is None
+            await cache.set("page", b"1")
+            assert await cache.get("page") == b"1"
+            await cache.invalidate()
+            assert await cache.get("page") is None
+
+        asyncio.run(scenario())
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_invalidate_while_producing(self):
+        cache = NamespacedCache("test", LocalBackend())
+
+        async def scenario():
+            async def stale_page() -> bytes:
+                # A write commits and invalidates while the page is built.
+                await cache.invalidate()
+                return b"stale"
+
+            assert await cache.get_or_set("page", stale_page) == b"stale"
+            assert await cache.get("page") is None
+
+        asyncio.run(scenario())
+
+    def test_redis_entries_expire(self):
+        client = FakeRedis()
+        cache = NamespacedCache("test", RedisBackend(client, ttl=30))
+        asyncio.run(cache.set("page", b"1"))
+        assert client.expiry["test:0:page"] == 30
+
+    def test_backend_failure_is_a_miss(self):
+        cache = NamespacedCache("test", BrokenBackend())
+        assert asyncio.run(cache.get("page")) is None
+        asyncio.run(cache.set("page", b"1"))
+        assert (cache.misses, cache.errors) == (1, 2)
+
+
+class CopyFailingSession:
+    """
+    Stands in for an asyncpg session whose COPY the server rejects.
+    """
+
+    def __init__(self):
+        self.info = {}
+        self.rolled_back = False
+
+    def get_bind(self):
+        dialect = SimpleNamespace(name="postgresql", driver="asyncpg")
+        return SimpleNamespace(dialect=dialect)
+
+    async def connection(self):
+        return self
+
+    async def execute(self, statement):
+        pass
+
+    async def get_raw_connection(self):
+        async def copy_records_to_table(*args, **kwargs):
+            raise asyncpg.NotNullViolationError("null value in column nombre")
+
+        return SimpleNamespace(
+            driver_connection=SimpleNamespace(
+                copy_records_to_table=copy_records_to_table
+            )
+        )
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+class TestImportRecords:
+    def test_rejected_copy_fails_the_batch(self):
+        db = CopyFailingSession()
+        record = {"nombre": "a", "email": "a@a.do", "telefono": "1"}
+
+        async def body():
+            yield "\n".join(json.dumps(record) for _ in range(2)).encode()
+
+        report = asyncio.run(
+            import_records(
+                db,
+                body(),
+                ExportFormat.ndjson,
+                Cliente.__table__,
+                "cliente_id",
+                cliente_row,
+            )
+        )
+        assert db.rolled_back
+        assert (report.imported, report.failed) == (0, 2)
+        assert "null value" in report.errors[0].detail
@@ -0,0 +1,138 @@
+import csv
+import io
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+class TestGet:
+    endpoint = "/empresas"
+
+    def test_single_empresa(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        rnc = cuenta_graph[0].rnc
+        response = api_client.get(f"{self.endpoint}/{rnc}")
+        data = response.json()
+        assert response.status_code == 200
+        assert len(data["relacionados"]) == 2
+        assert len(data["cuenta"]["servicios"]) == 2
+        assert len(data["cuenta"]["servicios"][0]["tags"]) == 2
+
+    def test_queries_do_not_grow_with_page_size(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        api_client.get(self.endpoint, params={"limit": 1})
+        single_page = len(api_client.statements)
+        response = api_client.get(self.endpoint, params={"limit": 3})
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 3
+        assert len(api_client.statements) == single_page
+
+
+class TestExport:
+    endpoint = "/empresas/export"
+
+    def test_csv(self, api_client: TestClient, cuenta_graph: list[models.Empresa]):
+        response = api_client.get(self.endpoint, params={"format": "csv"})
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert {row["rnc"] for row in rows} >= {e.rnc for e in cuenta_graph}
+        assert rows[0]["tipo_de_persona"] == "juridica"
+
+
+class TestImport:
+    endpoint = "/empresas/import"
+
+    def test_csv(self, api_client: TestClient, db: Session):
+        body = (
+            "rnc,nombre,tipo_de_persona\n"
+            "imp-1,Primera,fisica\n"
+            "imp-2,Segunda,otra\n"
+            "imp-1,Primera SRL,juridica\n"
+        )
+        response = api_client.post(
+            self.endpoint, params={"format": "csv"}, content=body
+        )
+        report = response.json()
+        assert response.status_code == 200
+        assert report["received"] == 3
+        assert report["imported"] == 2
+        assert report["errors"][0]["row"] == 2
+        empresa = db.get(models.Empresa, "imp-1")
+        assert empresa.nombre == "Primera SRL"
+        assert empresa.tipo_de_persona == "juridica"
+
+
+class TestConditionalGet:
+    endpoint = "/empresas"
+
+    def test_not_modified(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        path = f"{self.endpoint}/{cuenta_graph[1].rnc}"
+        response = api_client.get(path)
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        response = api_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert len(api_client.statements) == 1
+
+    def test_nested_change_changes_etag(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa], db: Session
+    ):
+        empresa = cuenta_graph[2]
+        path = f"{self.endpoint}/{empresa.rnc}"
+        etag = api_client.get(path).headers["ETag"]
+        tag = db.get(models.Empresa, empresa.rnc).cuenta.servicios[0].tags[0]
+        tag.nombre = f"renamed-{tag.tag_id}"
+        db.commit()
+        response = api_client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+
+class TestFilters:
+    endpoint = "/empresas"
+
+    def test_filter_and_sort_with_cursor(self, api_client: TestClient, db: Session):
+        db.add_all(
+            [
+                models.Empresa(rnc=f"fil-{n}", nombre=n, tipo_de_persona="fisica")
+                for n in ("zz-filtro-a", "zz-filtro-b", "zz-filtro-c")
+            ]
+        )
+        db.commit()
+        params = {"tipo_de_persona": "fisica", "sort": "nombre", "order": "desc"}
+        response = api_client.get(self.endpoint, params={**params, "limit": 2})
+        page = response.json()
+        assert [e["nombre"] for e in page["items"]] == ["zz-filtro-c", "zz-filtro-b"]
+        assert all(e["tipo_de_persona"] == "fisica" for e in page["items"])
+        response = api_client.get(
+            self.endpoint, params={**params, "limit": 1, "cursor": page["next_cursor"]}
+        )
+        assert [e["nombre"] for e in response.json()["items"]] == ["zz-filtro-a"]
+
+    def test_unknown_sort_column(self, api_client: TestClient):
+        response = api_client.get(self.endpoint, params={"sort": "rnc"})
+        assert response.status_code == 422
+
+
+class TestBatchGet:
+    endpoint = "/empresas"
+
+    def test_eager_loads_once(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        rncs = [e.rnc for e in reversed(cuenta_graph)]
+        response = api_client.get(self.endpoint, params={"rnc": ",".join(rncs)})
+        items = response.json()["items"]
+        assert [e["rnc"] for e in items] == rncs
+        assert all(len(e["relacionados"]) == 2 for e in items)
+        single = api_client.statements
+        api_client.get(self.endpoint, params={"rnc": rncs[0]})
+        assert len(api_client.statements) == len(single)
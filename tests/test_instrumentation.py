@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+
+from app.endpoints.dependencies import auth
+from app.instrumentation import redact
+from app.metrics import RequestMetrics
+
+
+class TestRedact:
+    def test_named_parameters(self):
+        assert redact({"email": "a@b.c", "limit": 20}) == {"email": "?", "limit": "?"}
+
+    def test_positional_parameters(self):
+        assert redact(("a@b.c", 20)) == ["?", "?"]
+
+    def test_executemany(self):
+        redacted = redact([{"nombre": "a"}, {"nombre": "b"}])
+        assert redacted == {"executemany": 2, "first": {"nombre": "?"}}
+
+
+class TestServerTiming:
+    def test_reports_request_statements(self, api_client: TestClient):
+        response = api_client.get("/tags")
+        timing = response.headers["Server-Timing"]
+        assert f'desc="{len(api_client.statements)} statements"' in timing
+        assert "total;dur=" in timing
+
+
+class TestMetrics:
+    def test_route_series(self):
+        metrics = RequestMetrics()
+        series = metrics.route("GET", "/tags")
+        series.record(200, 0.02)
+        series.record(503, 0.5)
+        assert metrics.route("GET", "/tags") is series
+        assert series.responses == {200: 1, 503: 1}
+        assert series.errors == 1
+
+    def test_exposition(self, api_client: TestClient, monkeypatch):
+        monkeypatch.setattr(auth, "METRICS_TOKEN", "scrape")
+        api_client.get("/tags")
+        response = api_client.get(
+            "/internal/metrics", headers={"Authorization": "Bearer scrape"}
+        )
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_requests_total{method="GET",route="/tags",status="200"}' in body
+        assert (
+            'http_request_duration_seconds_bucket{method="GET",route="/tags",le="+Inf"}'
+            in body
+        )
+        assert "http_requests_in_flight 1" in body
+
+    def test_scrape_token(self, api_client: TestClient, monkeypatch):
+        headers = {"Authorization": "Bearer scrape"}
+        assert api_client.get("/internal/metrics", headers=headers).status_code == 403
+        monkeypatch.setattr(auth, "METRICS_TOKEN", "other")
+        assert api_client.get("/internal/metrics", headers=headers).status_code == 401
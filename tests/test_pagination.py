@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.endpoints.dependencies.pagination import paginate_query, count_query
+from app.models import Empresa
+from app.schemas.pagination import PagintationParams, encode_cursor, decode_cursor
+
+
+class TestCursor:
+    def test_round_trip(self):
+        created_at = datetime(2024, 2, 6, 21, 59, 42, 392937)
+        cursor = encode_cursor(created_at, "101-12345-6")
+        assert decode_cursor(cursor) == (created_at, "101-12345-6")
+
+    def test_string_sort_value(self):
+        cursor = encode_cursor("Acme", "101")
+        assert decode_cursor(cursor, str) == ("Acme", "101")
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestPaginateQuery:
+    def test_offset_mode(self):
+        params = PagintationParams(limit=10, offset=20)
+        query = paginate_query(select(Empresa), params, Empresa.created_at, Empresa.rnc)
+        sql = str(query)
+        assert "ORDER BY empresas.created_at, empresas.rnc" in sql
+        assert "OFFSET" in sql
+
+    def test_cursor_mode(self):
+        cursor = encode_cursor(datetime(2024, 1, 1), "101")
+        params = PagintationParams(limit=10, cursor=cursor)
+        query = paginate_query(select(Empresa), params, Empresa.created_at, Empresa.rnc)
+        sql = str(query)
+        assert "(empresas.created_at, empresas.rnc) >" in sql
+        assert "OFFSET" not in sql
+
+    def test_descending_cursor(self):
+        cursor = encode_cursor("Acme", "101")
+        params = PagintationParams(limit=10, cursor=cursor)
+        query = paginate_query(
+            select(Empresa), params, Empresa.nombre, Empresa.rnc, descending=True
+        )
+        sql = str(query)
+        assert "ORDER BY empresas.nombre DESC, empresas.rnc DESC" in sql
+        assert "(empresas.nombre, empresas.rnc) <" in sql
+
+    def test_invalid_cursor(self):
+        params = PagintationParams(cursor="garbage")
+        with pytest.raises(HTTPException) as error:
+            paginate_query(select(Empresa), params, Empresa.created_at, Empresa.rnc)
+        assert error.value.status_code == 400
+
+
+class TestCountQuery:
+    def test_ignores_page_window(self):
+        params = PagintationParams(limit=10, offset=20)
+        query = paginate_query(select(Empresa), params, Empresa.created_at, Empresa.rnc)
+        sql = str(count_query(query))
+        assert sql.startswith("SELECT count(*) AS count_1")
+        assert "ORDER BY" not in sql
+        assert "LIMIT" not in sql
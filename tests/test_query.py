@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+
+from app import models
+from app.endpoints.routers import query
+
+
+def chain(depth: int) -> dict:
+    """
+    cuentas -> empresa -> cuenta -> empresa ... nested `depth` levels deep.
+    """
+    node: dict = {}
+    for i in range(depth):
+        node = {"expand": {("cuenta" if i % 2 else "empresa"): node}}
+    return node
+
+
+class TestQuery:
+    endpoint = "/query"
+
+    def test_nested_levels_one_statement_each(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        clientes = [c for e in cuenta_graph for c in e.relacionados]
+        ids = [str(c.cliente_id) for c in clientes]
+        query = {
+            "resource": "clientes",
+            "ids": ids,
+            "fields": ["cliente_id", "nombre"],
+            "expand": {
+                "empresas": {
+                    "fields": ["rnc"],
+                    "expand": {
+                        "cuenta": {
+                            "fields": ["cuenta_id"],
+                            "expand": {"servicios": {"expand": {"tags": {}}}},
+                        }
+                    },
+                }
+            },
+        }
+        response = api_client.post(self.endpoint, json=query)
+        data = response.json()
+        assert response.status_code == 200
+        assert [c["cliente_id"] for c in data["items"]] == ids
+        cliente = data["items"][0]
+        assert set(cliente) == {"cliente_id", "nombre", "empresas"}
+        cuenta = cliente["empresas"][0]["cuenta"]
+        assert set(cuenta) == {"cuenta_id", "servicios"}
+        assert len(cuenta["servicios"]) == 2
+        assert len(cuenta["servicios"][0]["tags"]) == 2
+        # The clientes plus one SELECT per relationship level.
+        assert len(api_client.statements) == 5
+
+    def test_first_records_without_ids(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        response = api_client.post(
+            self.endpoint,
+            json={"resource": "cuentas", "limit": 2, "expand": {"empresa": {}}},
+        )
+        items = response.json()["items"]
+        assert response.status_code == 200
+        assert len(items) == 2
+        assert all(item["empresa"]["rnc"] == item["rnc"] for item in items)
+
+    def test_unknown_relationship(self, api_client: TestClient):
+        response = api_client.post(
+            self.endpoint, json={"resource": "tags", "expand": {"cuentas": {}}}
+        )
+        assert response.status_code == 400
+        assert "cuentas" in response.json()["detail"]
+
+    def test_comma_joined_relationship(self, api_client: TestClient):
+        response = api_client.post(
+            self.endpoint, json={"resource": "tags", "expand": {"servicios,tags": {}}}
+        )
+        assert response.status_code == 400
+        assert "servicios,tags" in response.json()["detail"]
+
+    def test_empty_fields(self, api_client: TestClient):
+        response = api_client.post(
+            self.endpoint, json={"resource": "tags", "fields": []}
+        )
+        assert response.status_code == 400
+
+    def test_depth_limit(self, api_client: TestClient):
+        response = api_client.post(
+            self.endpoint, json={"resource": "cuentas", **chain(5)}
+        )
+        assert response.status_code == 400
+        assert "deeper" in response.json()["detail"]
+
+    def test_cost_limit(self, api_client: TestClient):
+        servicios = {"expand": {"tags": {}}}
+        empresa = {
+            "expand": {
+                "relacionados": {},
+                "cuenta": {"expand": {"servicios": servicios}},
+            }
+        }
+        query = {
+            "resource": "cuentas",
+            "expand": {"empresa": empresa, "servicios": {"expand": {"tags": {}}}},
+        }
+        assert api_client.post(self.endpoint, json=query).status_code == 200
+        query["expand"]["servicios"]["expand"]["tags"] = {"expand": {"servicios": {}}}
+        response = api_client.post(self.endpoint, json=query)
+        assert response.status_code == 400
+        assert "statements" in response.json()["detail"]
+
+    def test_routed_as_read(self):
+        # get_db is overridden in the API tests; see tests/test_database.py.
+        assert query.run_query.read_only
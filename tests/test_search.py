@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app import models
+from app.endpoints.dependencies.search import escape_like, search_document, search_query
+
+
+class TestSearchQuery:
+    def test_postgresql_uses_indexed_expression(self):
+        document = search_document(models.Empresa.nombre, models.Empresa.rnc)
+        query = search_query(
+            select(models.Empresa), document, "acme", "postgresql", models.Empresa.rnc
+        )
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert "empresas.nombre || ' ' || empresas.rnc" in sql
+        assert "<%" in sql
+        assert "ORDER BY word_similarity(" in sql
+
+    def test_escapes_wildcards(self):
+        assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+
+
+class TestSearchEndpoints:
+    def test_clientes_by_partial_email(self, api_client: TestClient, db: Session):
+        db.add_all(
+            [
+                models.Cliente(nombre="Rosa", email="rosa@busqueda.do", telefono="1"),
+                models.Cliente(nombre="Otro", email="otro@x.do", telefono="2"),
+            ]
+        )
+        db.commit()
+        response = api_client.get("/clientes/search", params={"q": "BUSQUEDA"})
+        data = response.json()
+        assert response.status_code == 200
+        assert [c["nombre"] for c in data["items"]] == ["Rosa"]
+
+    def test_empresas_by_rnc(self, api_client: TestClient, db: Session):
+        db.add(
+            models.Empresa(
+                rnc="131-99887-7", nombre="Buscada", tipo_de_persona="fisica"
+            )
+        )
+        db.commit()
+        response = api_client.get("/empresas/search", params={"q": "99887"})
+        assert [e["nombre"] for e in response.json()["items"]] == ["Buscada"]
+
+    def test_short_term_rejected(self, api_client: TestClient):
+        response = api_client.get("/empresas/search", params={"q": "a"})
+        assert response.status_code == 422
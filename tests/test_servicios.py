@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+class TestGet:
+    endpoint = "/servicios"
+
+    def test_queries_do_not_grow_with_page_size(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        api_client.get(self.endpoint, params={"limit": 1})
+        single_page = len(api_client.statements)
+        response = api_client.get(self.endpoint, params={"limit": 6})
+        data = response.json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 6
+        assert all(len(s["tags"]) == 2 for s in data["items"])
+        assert len(api_client.statements) == single_page
+
+    def test_filter_by_tag(
+        self, api_client: TestClient, db: Session, cuenta_graph: list[models.Empresa]
+    ):
+        untagged = models.Servicio(nombre="sin-tag")
+        db.add(untagged)
+        db.commit()
+        tag_id = cuenta_graph[0].cuenta.servicios[0].tags[0].tag_id
+        response = api_client.get(self.endpoint, params={"tag": str(tag_id)})
+        data = response.json()
+        assert data["total"] == 6
+        assert str(untagged.servicio_id) not in {
+            s["servicio_id"] for s in data["items"]
+        }
+
+
+class TestUpsert:
+    endpoint = "/servicios/upsert"
+
+    def test_partial_ids(self, api_client: TestClient, db: Session):
+        servicio = models.Servicio(nombre="antes")
+        db.add(servicio)
+        db.commit()
+        payload = [
+            {"servicio_id": str(servicio.servicio_id), "nombre": "despues"},
+            {"nombre": "nuevo"},
+        ]
+        response = api_client.post(self.endpoint, json=payload)
+        report = response.json()
+        assert response.status_code == 200
+        assert report["upserted"] == 2
+        assert report["ids"][0] == str(servicio.servicio_id)
+        db.refresh(servicio)
+        assert servicio.nombre == "despues"
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+class TestGet:
+    endpoint = "/tags"
+
+    def test_queries_do_not_grow_with_page_size(
+        self, api_client: TestClient, cuenta_graph: list[models.Empresa]
+    ):
+        api_client.get(self.endpoint, params={"limit": 1})
+        single_page = len(api_client.statements)
+        response = api_client.get(self.endpoint, params={"limit": 2})
+        data = response.json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 2
+        assert len(api_client.statements) == single_page
+
+
+class TestUpsert:
+    endpoint = "/tags/upsert"
+
+    def test_dedupes_by_nombre(self, api_client: TestClient, db: Session):
+        db.add(models.Tag(nombre="existing"))
+        db.commit()
+        existing = db.scalars(select(models.Tag).filter_by(nombre="existing")).one()
+        payload = [{"nombre": n} for n in ("existing", "nuevo", "otro", "nuevo")]
+        response = api_client.post(
+            self.endpoint, params={"chunk_size": 2}, json=payload
+        )
+        report = response.json()
+        assert response.status_code == 200
+        assert report["upserted"] == 4
+        assert report["failed"] == 0
+        assert report["ids"][0] == str(existing.tag_id)
+        assert report["ids"][1] == report["ids"][3]
+        assert len(set(report["ids"])) == 3
+
+    def test_create_conflict(self, api_client: TestClient):
+        response = api_client.post("/tags", json=[{"nombre": "existing"}])
+        assert response.status_code == 409
+
+
+class TestCatalogCache:
+    endpoint = "/tags"
+
+    def test_pages_are_cached_until_a_write(self, api_client: TestClient):
+        first = api_client.get(self.endpoint, params={"limit": 50}).json()
+        cached = api_client.get(self.endpoint, params={"limit": 50})
+        assert cached.json() == first
+        assert api_client.statements == []
+        api_client.post(f"{self.endpoint}/upsert", json=[{"nombre": "cache-bust"}])
+        fresh = api_client.get(self.endpoint, params={"limit": 50}).json()
+        assert fresh["total"] == first["total"] + 1
+
+    def test_fieldsets_are_cached_separately(self, api_client: TestClient):
+        full = api_client.get(self.endpoint, params={"limit": 5}).json()
+        sparse = api_client.get(self.endpoint, params={"limit": 5, "fields": "nombre"})
+        assert all(set(tag) == {"nombre"} for tag in sparse.json()["items"])
+        assert all("servicios" in tag for tag in full["items"])
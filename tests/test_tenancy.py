@@ -0,0 +1,167 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.endpoints.dependencies import auth
+
+from .conftest import TEST_ORGANIZACION_ID
+
+
+OTHER_ORGANIZACION_ID = uuid.UUID("00000000-0000-4000-8000-0000000000b2")
+
+
+@pytest.fixture(scope="module")
+def foreign_rows(db: Session) -> dict:
+    """
+    Rows owned by another organizacion, written through an unscoped session.
+    """
+    with Session(db.get_bind()) as other:
+        cliente = models.Cliente(
+            nombre="ajeno",
+            email="ajeno@otra.do",
+            telefono="0",
+            organizacion_id=OTHER_ORGANIZACION_ID,
+        )
+        servicio = models.Servicio(
+            nombre="servicio-ajeno", organizacion_id=OTHER_ORGANIZACION_ID
+        )
+        empresa = models.Empresa(
+            rnc="ajeno-00001",
+            nombre="empresa-ajena",
+            tipo_de_persona="juridica",
+            organizacion_id=OTHER_ORGANIZACION_ID,
+        )
+        other.add_all([cliente, servicio, empresa])
+        other.commit()
+        return {
+            "cliente": cliente.cliente_id,
+            "servicio": servicio.servicio_id,
+            "empresa": empresa.rnc,
+        }
+
+
+class TestScoping:
+    def test_foreign_rows_are_invisible(
+        self, api_client: TestClient, foreign_rows: dict
+    ):
+        response = api_client.get(f"/clientes/{foreign_rows['cliente']}")
+        assert response.status_code == 404
+        response = api_client.get("/clientes", params={"limit": 50})
+        ids = {c["cliente_id"] for c in response.json()["items"]}
+        assert str(foreign_rows["cliente"]) not in ids
+
+    def test_foreign_rows_are_not_deleted(
+        self, api_client: TestClient, db: Session, foreign_rows: dict
+    ):
+        response = api_client.delete(f"/clientes/{foreign_rows['cliente']}")
+        assert response.status_code == 404
+        with Session(db.get_bind()) as other:
+            assert other.get(models.Cliente, foreign_rows["cliente"]) is not None
+
+    def test_new_rows_are_assigned(self, api_client: TestClient, db: Session):
+        payload = {"nombre": "propio", "email": "p@p.do", "telefono": "1"}
+        response = api_client.post("/clientes", json=payload)
+        cliente = db.get(models.Cliente, uuid.UUID(response.json()["cliente_id"]))
+        assert cliente.organizacion_id == TEST_ORGANIZACION_ID
+
+    def test_upsert_does_not_take_over_foreign_keys(
+        self, api_client: TestClient, db: Session, foreign_rows: dict
+    ):
+        payload = [
+            {"servicio_id": str(foreign_rows["servicio"]), "nombre": "robado"},
+            {"nombre": "nuevo-propio"},
+        ]
+        report = api_client.post("/servicios/upsert", json=payload).json()
+        assert report["upserted"] == 1
+        assert report["failed"] == 1
+        assert report["ids"][0] is None
+        with Session(db.get_bind()) as other:
+            servicio = other.get(models.Servicio, foreign_rows["servicio"])
+            assert servicio.nombre == "servicio-ajeno"
+            assert servicio.organizacion_id == OTHER_ORGANIZACION_ID
+
+    def test_no_cuenta_for_foreign_empresa(
+        self, api_client: TestClient, db: Session, foreign_rows: dict
+    ):
+        payload = {"rnc": foreign_rows["empresa"], "servicios": []}
+        response = api_client.post("/cuentas", json=payload)
+        assert response.status_code == 404
+        with Session(db.get_bind()) as other:
+            cuenta = other.scalars(
+                select(models.Cuenta).filter_by(rnc=foreign_rows["empresa"])
+            ).first()
+            assert cuenta is None
+
+    def test_taken_rnc_conflicts_alike(
+        self, api_client: TestClient, db: Session, foreign_rows: dict
+    ):
+        own = models.Empresa(rnc="propio-0001", nombre="p", tipo_de_persona="fisica")
+        db.add(own)
+        db.commit()
+        responses = [
+            api_client.post(
+                "/empresas",
+                json={"rnc": rnc, "nombre": "copia", "tipo_de_persona": "fisica"},
+            )
+            for rnc in (own.rnc, foreign_rows["empresa"])
+        ]
+        assert [r.status_code for r in responses] == [409, 409]
+        assert responses[0].json() == responses[1].json()
+
+    def test_import_reports_foreign_keys(
+        self, api_client: TestClient, db: Session, foreign_rows: dict
+    ):
+        body = "\n".join(
+            json.dumps(row)
+            for row in [
+                {
+                    "cliente_id": str(foreign_rows["cliente"]),
+                    "nombre": "robado",
+                    "email": "r@r.do",
+                    "telefono": "1",
+                },
+                {"nombre": "importado", "email": "i@i.do", "telefono": "2"},
+            ]
+        )
+        report = api_client.post("/clientes/import", content=body).json()
+        assert (report["imported"], report["failed"]) == (1, 1)
+        assert report["errors"][0]["row"] == 1
+        with Session(db.get_bind()) as other:
+            cliente = other.get(models.Cliente, foreign_rows["cliente"])
+            assert cliente.nombre == "ajeno"
+
+
+class TestGetOrganizacion:
+    def resolve(self, organizaciones, header=None):
+        usuario_id = uuid.uuid4()
+        user = auth.AuthenticatedUser(
+            usuario_id, "user", True, frozenset(organizaciones)
+        )
+        auth.user_cache.set(str(usuario_id), user)
+        payload = {"sub": str(usuario_id)}
+        return asyncio.run(auth.get_organizacion(None, payload, header))
+
+    def test_single_membership(self):
+        assert self.resolve([TEST_ORGANIZACION_ID]) == TEST_ORGANIZACION_ID
+
+    def test_header_selects_membership(self):
+        organizaciones = [TEST_ORGANIZACION_ID, OTHER_ORGANIZACION_ID]
+        chosen = self.resolve(organizaciones, OTHER_ORGANIZACION_ID)
+        assert chosen == OTHER_ORGANIZACION_ID
+
+    def test_ambiguous_without_header(self):
+        with pytest.raises(HTTPException) as error:
+            self.resolve([TEST_ORGANIZACION_ID, OTHER_ORGANIZACION_ID])
+        assert error.value.status_code == 400
+
+    def test_header_outside_memberships(self):
+        with pytest.raises(HTTPException) as error:
+            self.resolve([TEST_ORGANIZACION_ID], OTHER_ORGANIZACION_ID)
+        assert error.value.status_code == 403